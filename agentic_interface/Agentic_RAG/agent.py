@@ -59,7 +59,7 @@ class AgenticRAG:
     Conversation history is passed explicitly per request.
     """
     
-    def __init__(self):
+    def __init__(self, user_db_operations: UserDbOperations | None = None):
         """
         Initialize the AgenticRAG system
         
@@ -69,6 +69,10 @@ class AgenticRAG:
         - LangGraph workflow
         - Database connection
         - System prompt
+
+        Args:
+            user_db_operations: Shared database layer (the API server passes its
+                app-scoped instance); a private one is created if omitted
         """
         # Initialize GPT-4 model with tool calling
         self.llm = ChatOpenAI(
@@ -98,8 +102,8 @@ class AgenticRAG:
         # Initialize conversation history with system message
         self.messageHistory = [self.sys_msg]
 
-        # Initialize database operations
-        self.user_db_operations = UserDbOperations()
+        # Database operations - shared with the API server when injected
+        self.user_db_operations = user_db_operations or UserDbOperations()
         
         print("✓ AgenticRAG initialized successfully")
 
@@ -233,9 +237,9 @@ class AgenticRAG:
             await self._prepare_context(query, user_id, query_history, response_history)
         )
 
-        # Execute the ReAct graph workflow
+        # Execute the ReAct graph workflow - awaited so concurrent requests overlap their LLM/tool I/O
         start_time = time.time()
-        messages = self.react_graph.invoke({"messages": message_history})
+        messages = await self.react_graph.ainvoke({"messages": message_history})
         inference_time = time.time() - start_time
 
         if eval_mode:
@@ -436,16 +440,17 @@ class AgenticRAG:
         )
         message_history.extend(message_conversation)
 
-        user_preferences = await self.user_db_operations.get_agentic_preferences(user_id)
+        # Preferences and device key are fetched together in one round-trip
+        user_context = await self.user_db_operations.get_user_context(user_id, "Oura Ring")
+        user_preferences = user_context.preferences
         if user_preferences is not None:
-            user_preferences = user_preferences[0]
             message_history.extend([
                 SystemMessage(content=f"User preferences: {user_preferences}")
             ])
         else:
             user_preferences = []
 
-        user_key = await self.__get_device_api_key(user_id, "Oura Ring")
+        user_key = user_context.api_key
         message_history.extend([
             SystemMessage(content=f"{user_specific_message}{user_id} USER_KEY: {user_key}")
         ])
@@ -533,16 +538,9 @@ class AgenticRAG:
             "role": "assistant",
             "content": response.content
         })
-        # Tool Call - returns _id in the form of a tuple: ex. (6,)
-        log_id = await self.user_db_operations.log_message(logger)
-        return log_id[0]
-    
-    async def __get_device_api_key(self, user_id: str, device_type: str) -> str:
-        """
-        Get the API key for the user - query via the user_db_call class
-        """
-        key = await self.user_db_operations.get_api_key(user_id, device_type)
-        return key
+        # Queued for the background writer - returns the row's log_uuid
+        log_id = self.user_db_operations.log_message(logger)
+        return log_id
 
 if __name__ == "__main__":
     agent = AgenticRAG()
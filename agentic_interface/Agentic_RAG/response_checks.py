@@ -1,6 +1,9 @@
 # Response Checks Class
+import logging
 from collections import defaultdict
 
+logger = logging.getLogger(__name__)
+
 class ResponseChecks:
     def __init__(self):
         pass
@@ -22,7 +25,8 @@ class ResponseChecks:
     def _check_oura_basic(self, response:dict) -> bool:
         # If call is successful, check the response to see if data is populated
         if not response or "data" not in response or not response['data']:
-            print(f"Basic check failed for response: {response}")
+            # Lazy %-args - the payload is only stringified when DEBUG logging is on
+            logger.debug("Basic check failed for response: %s", response)
             return False
         return True
 
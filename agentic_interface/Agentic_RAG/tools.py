@@ -19,32 +19,68 @@ Dependencies:
 - Oura Ring API for device data
 - Pinecone for vector search
 - HuggingFace for embeddings
-- PostgreSQL for user API keys
 """
 
-import requests
-import json
-from pinecone import Pinecone
-from langchain_huggingface import HuggingFaceEmbeddings
+import orjson
+from functools import lru_cache
+from pinecone import Index, Pinecone
 import pandas as pd
+import numpy as np
+import tiktoken
 
-from database.user_db_call import UserDbOperations
 from config.settings import settings
 from collections import Counter
 from Agentic_RAG.response_checks import ResponseChecks
+from DataSources.embeddings import get_embeddings
+from DataSources.get_request_devices import HttpGETDevice
+from DataSources.device_enum import Device
 
-# Singleton database connection for tool functions
-user_db_operations = UserDbOperations()
 response_checks = ResponseChecks()
 
 # ── Embedding mode config (reads from .env via settings) ──────────
 PC_INFERENCE_MODEL = "llama-text-embed-v2"
 PC_INFERENCE_DIMS = 1024
 
+# Oura tools go through the shared httpx client - same timeout and 429/5xx retry as OuraData
+_OURA = HttpGETDevice(Device.OURA_RING)
 
-def _embed_query(pc: Pinecone, query: str) -> list[float]:
-    """Return a query embedding using whichever backend PINECONE_EMBEDDING_MODE selects."""
-    if settings.PINECONE_EMBEDDING_MODE == "pinecone_inference":
+# Distinct query strings whose embeddings are kept in memory
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+
+# Pre-built template for formatting Pinecone matches returned to the LLM
+PASSAGE_TEMPLATE = "Source: {0[metadata][source]}, Text: {0[metadata][text]}, Similarity: {0[score]}"
+
+# Retrieved passage packing - overlapping transcript chunks are dropped and the total is capped
+PASSAGE_TOKEN_BUDGET = 1500
+PASSAGE_DUPLICATE_JACCARD = 0.7
+SHINGLE_SIZE = 3
+PASSAGE_ENCODING = "o200k_base"  # tokenizer used by gpt-4.1 - prefetched into TIKTOKEN_CACHE_DIR by the Dockerfile
+
+
+def _l2_normalize(vector: list[float]) -> list[float]:
+    """Scale a vector to unit length so cosine similarity reduces to a dot product."""
+    v = np.asarray(vector, dtype=np.float32)
+    v /= np.linalg.norm(v) + 1e-12
+    return v.tolist()
+
+
+@lru_cache(maxsize=1)
+def _get_pinecone() -> tuple[Pinecone, Index]:
+    """Return the process-wide Pinecone client and index handle, created on first use and reused by every query."""
+    pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+    return pc, pc.Index(host=settings.PINECONE_HOST)
+
+
+def _embed_query(query: str) -> list[float]:
+    """Return a unit-length query embedding using whichever backend PINECONE_EMBEDDING_MODE selects."""
+    return list(_cached_query_embedding(settings.PINECONE_EMBEDDING_MODE, query))
+
+
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def _cached_query_embedding(mode: str, query: str) -> tuple[float, ...]:
+    """Embed a query once per (mode, text) pair; repeated queries skip the model forward pass / inference call."""
+    if mode == "pinecone_inference":
+        pc, _ = _get_pinecone()
         result = pc.inference.embed(
             model=PC_INFERENCE_MODEL,
             inputs=[query],
@@ -54,14 +90,73 @@ def _embed_query(pc: Pinecone, query: str) -> list[float]:
                 "dimension": PC_INFERENCE_DIMS,
             },
         )
-        return result[0].values
+        return tuple(_l2_normalize(result[0].values))
+
+    return tuple(get_embeddings().embed_query(query))
+
+
+@lru_cache(maxsize=1)
+def get_passage_encoding() -> tiktoken.Encoding:
+    """Process-wide PASSAGE_ENCODING tokenizer - the BPE file is loaded (downloaded if not cached) on first call only."""
+    return tiktoken.get_encoding(PASSAGE_ENCODING)
+
 
-    embeddings = HuggingFaceEmbeddings(model_name=settings.PINECONE_EMBEDDING_MODEL)
-    return embeddings.embed_query(query)
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    """Word 3-grams of a passage, used for near-duplicate detection."""
+    words = text.lower().split()
+    return set(zip(*(words[i:] for i in range(SHINGLE_SIZE)))) or {tuple(words)}
+
+
+def _format_passages(matches: list) -> str:
+    """
+    Format Pinecone matches for the LLM, best score first
+
+    Skips a match whose text overlaps an already kept passage by more than
+    PASSAGE_DUPLICATE_JACCARD (adjacent transcript chunks share text) and stops
+    once PASSAGE_TOKEN_BUDGET would be exceeded. The top match is always kept.
+    """
+    encoding = get_passage_encoding()
+    kept_shingles: list[set[tuple[str, ...]]] = []
+    passages: list[str] = []
+    used_tokens = 0
+    for match in matches:
+        shingles = _shingles(match["metadata"]["text"])
+        if any(len(shingles & kept) / len(shingles | kept) > PASSAGE_DUPLICATE_JACCARD for kept in kept_shingles):
+            continue
+        passage = PASSAGE_TEMPLATE.format(match)
+        tokens = len(encoding.encode(passage))
+        if passages and used_tokens + tokens > PASSAGE_TOKEN_BUDGET:
+            break
+        kept_shingles.append(shingles)
+        passages.append(passage)
+        used_tokens += tokens
+    return "\n".join(passages)
+
+
+def _search_matches(query: str, namespace: str) -> list:
+    """Raw Pinecone top-3 matches for a query, in rank order."""
+    _, index = _get_pinecone()
+    results = index.query(
+        namespace=namespace,
+        vector=_embed_query(query),
+        top_k=3,
+        include_metadata=True,
+    )
+    return results["matches"]
+
+
+def get_huberman_passages(query: str) -> list[str]:
+    """
+    Pinecone's top-3 Huberman passages for a query, unfiltered and in rank order
+
+    Retriever evals score these directly - the dedup and token budget in
+    _format_passages only shape what the agent sees.
+    """
+    return [PASSAGE_TEMPLATE.format(match) for match in _search_matches(query, settings.PINECONE_NAMESPACE_1)]
 
 
 # ========== Oura Ring Data Tools ==========
-def sleep_analysis(start_date:str, end_date:str, user_key:str) -> str:
+async def sleep_analysis(start_date:str, end_date:str, user_key:str) -> str:
     """
     Analyze the sleep of the user on a particular data
     
@@ -99,7 +194,7 @@ def sleep_analysis(start_date:str, end_date:str, user_key:str) -> str:
 
     # Fetch data from Oura API
     try:
-        response = requests.request("GET", URL, headers=headers, params=params).json()
+        response = await _OURA.fetch_payload(URL, params, headers)
     except Exception as e:
         return f"Unable to retrieve sleep data due to {e}"
 
@@ -186,10 +281,10 @@ def sleep_analysis(start_date:str, end_date:str, user_key:str) -> str:
         'awake_time': f"{extracted_data['awake_time'] // 3600} hours and {((extracted_data['awake_time'] % 3600) // 60)} minutes"
     })
 
-    # JSON dumps? List[dicts] into a JSON string?
-    return json.dumps(res)
+    # List[dicts] into a JSON string
+    return orjson.dumps(res).decode()
 
-def get_sleep_data(start_date: str, end_date: str, user_key: str) -> str:
+async def get_sleep_data(start_date: str, end_date: str, user_key: str) -> str:
     """
     Fetch sleep metrics from Oura Ring API
     
@@ -224,7 +319,7 @@ def get_sleep_data(start_date: str, end_date: str, user_key: str) -> str:
 
     # Fetch data from Oura API
     try:
-        response = requests.request("GET", URL, headers=headers, params=params).json()
+        response = await _OURA.fetch_payload(URL, params, headers)
     except Exception as e:
         return f"Unable to retrieve sleep data due to {e}"
 
@@ -233,20 +328,15 @@ def get_sleep_data(start_date: str, end_date: str, user_key: str) -> str:
     if not checks['basic']:
         return "Data for the specified date appears to be unavailable or empty"
         
-    response_messages = []
-    for result in response["data"]:
-        score = result["score"]
-        contributors = result["contributors"]  # Dict of metric scores
-        day = result["day"]
-        response_messages.append({
-            "score": score,
-            "contributors": contributors,
-            "day": day
-        })
+    # Keep score, contributors (dict of metric scores) and day for each entry
+    response_messages = [
+        {"score": result["score"], "contributors": result["contributors"], "day": result["day"]}
+        for result in response["data"]
+    ]
 
-    return json.dumps(response_messages)
+    return orjson.dumps(response_messages).decode()
 
-def get_stress_data(start_date: str, end_date: str, user_key: str) -> str:
+async def get_stress_data(start_date: str, end_date: str, user_key: str) -> str:
     """
     Fetch stress metrics from Oura Ring API
     
@@ -273,30 +363,30 @@ def get_stress_data(start_date: str, end_date: str, user_key: str) -> str:
     }
 
     # Fetch data from Oura API
-    response = requests.request("GET", URL, headers=headers, params=params).json()
+    try:
+        response = await _OURA.fetch_payload(URL, params, headers)
+    except Exception as e:
+        return f"Unable to retrieve stress data due to {e}"
 
     if not response or "data" not in response:
         return "Unable to retrieve stress data"
 
-    response_messages = []
-    for result in response["data"]:
-        # Extract Score, Contributors, and Day
-        stress_high = result["stress_high"]
-        recovery_high = result["recovery_high"]
-        day = result["day"]
-        day_summary = result["day_summary"]
-        response_messages.append({
-            "stress_high": stress_high,
-            "recovery_high": recovery_high,
-            "day": day,
-            "day_summary": day_summary
-        })
+    # Extract high stress, high recovery, day and day summary for each entry
+    response_messages = [
+        {
+            "stress_high": result["stress_high"],
+            "recovery_high": result["recovery_high"],
+            "day": result["day"],
+            "day_summary": result["day_summary"]
+        }
+        for result in response["data"]
+    ]
 
-    return json.dumps(response_messages)
+    return orjson.dumps(response_messages).decode()
 
 # Get the user heart rate data from the Oura API between the start and end date
 # Returns: str - the heart rate data between the start and end date - formatted as a string
-def get_heart_rate_data(start_date: str, end_date: str, user_key: str) -> str:
+async def get_heart_rate_data(start_date: str, end_date: str, user_key: str) -> str:
     """
     Get the user heart rate data from the Oura API between the start and end date
     
@@ -319,7 +409,10 @@ def get_heart_rate_data(start_date: str, end_date: str, user_key: str) -> str:
     }
 
     # Make the GET Request
-    response = requests.request("GET", URL, headers=headers, params=params).json()
+    try:
+        response = await _OURA.fetch_payload(URL, params, headers)
+    except Exception as e:
+        return f"Unable to retrieve heart rate data due to {e}"
 
     if not response or "data" not in response or not response['data']:
         return "Unable to retrieve heart rate data"
@@ -341,7 +434,7 @@ def get_heart_rate_data(start_date: str, end_date: str, user_key: str) -> str:
         "average_bpm_workout": float(average_bpm_workout) if not pd.isna(average_bpm_workout) else None,
         "average_bpm_non_workout": float(average_bpm_non_workout) if not pd.isna(average_bpm_non_workout) else None
     }
-    return json.dumps(response_dict)
+    return orjson.dumps(response_dict).decode()
 
 # Andrew Huberman Podcast Transcripts
 # Returns: str - semantic search results - returning top 5 results from the vector db
@@ -359,19 +452,7 @@ def get_Andrew_Huberman_Insights(query:str) -> str:
     """
 
     try:
-        pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-        index = pc.Index(host=settings.PINECONE_HOST)
-        queryVec = _embed_query(pc, query)
-
-        results = index.query(
-            namespace=settings.PINECONE_NAMESPACE_1,
-            vector=queryVec,
-            top_k=3,
-            include_metadata=True,
-        )
-
-        response_messages = [f"Source: {result['metadata']['source']}, Text: {result['metadata']['text']}, Similarity: {result['score']}" for result in results["matches"]]
-        return "\n".join(response_messages)
+        return _format_passages(_search_matches(query, settings.PINECONE_NAMESPACE_1))
 
     except RuntimeError as r:
         raise RuntimeError("Pinecone Server Error")
@@ -386,21 +467,8 @@ def get_insights(query:str, scope:str = "all") -> str:
     scope: the scope of the insights to search for - options are "Andrew Huberman", "all" (default)
     """
     try:
-        pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-        index = pc.Index(host=settings.PINECONE_HOST)
-        queryVec = _embed_query(pc, query)
-
         namespace = settings.PINECONE_NAMESPACE_2 if scope == "Andrew Huberman" else settings.PINECONE_NAMESPACE_1
-
-        results = index.query(
-            namespace=namespace,
-            vector=queryVec,
-            top_k=3,
-            include_metadata=True,
-        )
-
-        response_messages = [f"Source: {result['metadata']['source']}, Text: {result['metadata']['text']}, Similarity: {result['score']}" for result in results["matches"]]
-        return "\n".join(response_messages)
+        return _format_passages(_search_matches(query, namespace))
 
     except RuntimeError as r:
         raise RuntimeError("Pinecone Server Error")
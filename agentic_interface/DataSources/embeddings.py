@@ -0,0 +1,44 @@
+# Shared HuggingFace Embedding Model
+
+# Libraries
+import threading
+import torch
+from langchain_huggingface import HuggingFaceEmbeddings
+from config.settings import settings
+
+# Constants
+EMBED_BATCH_SIZE = 64
+
+# Process-wide embedder and the lock guarding its first load
+_embeddings: HuggingFaceEmbeddings | None = None
+_embeddings_lock = threading.Lock()
+
+# Returns the process-wide embedder - the weights are loaded on first call only
+# The model is stateless, so ingestion (PineconeClass) and query-time tools share one copy
+# The lock makes concurrent first calls (startup warm-up, tool threads) wait for one load instead of each loading the weights
+def get_embeddings() -> HuggingFaceEmbeddings:
+    global _embeddings
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                _embeddings = _load_embeddings()
+    return _embeddings
+
+# Unit-length embeddings at insert and query time - lets the index use the dotproduct metric
+# Encode in fixed batches of 64 on the GPU when one is available, in fp16 there for tensor-core matmuls
+# EMBEDDING_BACKEND=onnx runs the encoder through ONNX Runtime instead - faster on CPU for small models like MiniLM
+# EMBEDDING_ONNX_FILE picks a specific ONNX export, e.g. a dynamically int8-quantized one for VNNI CPUs
+def _load_embeddings() -> HuggingFaceEmbeddings:
+    if settings.EMBEDDING_BACKEND == "onnx":
+        model_kwargs = {"backend": "onnx", "device": "cuda" if torch.cuda.is_available() else "cpu"}
+        if settings.EMBEDDING_ONNX_FILE:
+            model_kwargs["model_kwargs"] = {"file_name": settings.EMBEDDING_ONNX_FILE}
+    elif torch.cuda.is_available():
+        model_kwargs = {"device": "cuda", "model_kwargs": {"torch_dtype": torch.float16}}
+    else:
+        model_kwargs = {"device": "cpu"}
+    return HuggingFaceEmbeddings(
+        model_name = settings.PINECONE_EMBEDDING_MODEL,
+        encode_kwargs = {"batch_size": EMBED_BATCH_SIZE, "normalize_embeddings": True},
+        model_kwargs = model_kwargs
+    )
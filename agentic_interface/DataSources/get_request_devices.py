@@ -1,10 +1,23 @@
 # Http GET Request Class for Wearable Devices
 
 # Libraries
-import requests
-from requests.exceptions import HTTPError
+import httpx
+import orjson
+from httpx import HTTPStatusError
+from clients import http_client
 from DataSources.device_enum import Device
 from fastapi import HTTPException
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+# Status codes worth retrying - rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 3s to connect, 10s for everything else
+REQUEST_TIMEOUT = httpx.Timeout(10, connect=3)
+
+
+def _is_retryable(error: BaseException) -> bool:
+    return isinstance(error, HTTPException) and error.status_code in RETRY_STATUS_CODES
 
 
 # HttpGETDevice Class
@@ -13,25 +26,40 @@ from fastapi import HTTPException
 class HttpGETDevice():
     def __init__(self, deviceType: Device):
         self.deviceType = deviceType 
+        # Shared keep-alive client - reuses TCP/TLS connections to the device API host
+        self.client = http_client
 
     # Executes GET Request given the input arguments
     # URL (str): url endpoint for the GET call
     # Params (dict): parameter component of the GET Request
     # Headers (dict): contains authentication information - {"Authorization": key}
-    def send_request(self, URL: str, params: dict, header: dict) -> dict:
+    # Returns the 'data' payload of the response body
+    async def send_request(self, URL: str, params: dict, header: dict) -> dict:
+        return (await self.fetch_payload(URL, params, header))['data']
+
+    # Same GET as send_request, but returns the whole parsed response body
+    # Retries 429/5xx responses with jittered exponential backoff (4 attempts total)
+    @retry(
+        reraise=True,
+        stop=stop_after_attempt(4),
+        wait=wait_exponential_jitter(initial=0.25, max=4),
+        retry=retry_if_exception(_is_retryable),
+    )
+    async def fetch_payload(self, URL: str, params: dict, header: dict) -> dict:
         try:
-            response = requests.get(
+            response = await self.client.get(
                 URL, 
                 headers = header, 
-                params = params
+                params = params,
+                timeout = REQUEST_TIMEOUT
             )
             response.raise_for_status()
-            return response.json()['data']
-        except HTTPError as http_error: 
+            return orjson.loads(response.content)
+        except HTTPStatusError as http_error: 
             if response.status_code in {400, 401, 403, 422, 429}:
                 # Client-Side Error Responses from Oura Ring API
                 # Handle expected client-side errors
-                resString = f"{self.deviceType.value} API Client Error {response.status_code}: {response.json()['message']}"
+                resString = f"{self.deviceType.value} API Client Error {response.status_code}: {orjson.loads(response.content)['message']}"
                 raise HTTPException(status_code=response.status_code, detail=resString)
             elif response.status_code >= 500 and response.status_code < 600:
                 # For internal server errors - don't send back details of the error message as this is internal 
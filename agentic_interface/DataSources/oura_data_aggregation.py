@@ -6,25 +6,33 @@ BASEURL = "https://api.ouraring.com/v2/"
 SLEEPURL = "usercollection/daily_sleep"
 STRESSURL = "usercollection/daily_stress"
 HRURL = "usercollection/heartrate"
-MAXRETRY = 3
 
 # Libraries
-from datetime import datetime
-
+import asyncio
 from DataSources.get_request_devices import HttpGETDevice
 from DataSources.device_enum import Device
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from fastapi import HTTPException
 
+# Current date in UTC - every Oura date window (OuraData defaults, load_user_devices_service) is built from this
+# so the server's local timezone never shifts the window by a day
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
 # Class for the Oura Ring Device
-# startDate: current Date - 3 days (to be modified to be more flexible)
-# endDate: current Date
+# startDate: current Date - 3 days when not provided (to be modified to be more flexible)
+# endDate: current Date when not provided
 # Key: API Key from user
 class OuraData:
-    def __init__(self, key: str, start_date: str = str(datetime.now() - timedelta(days=3)), end_date: str = str(datetime.now())):
-        # 3 Day Data Retrieval
-        self.start_date = start_date
-        self.end_date = end_date
+    def __init__(self, key: str, start_date: str | None = None, end_date: str | None = None):
+        # 3 Day Data Retrieval - defaults resolved per instance, not frozen at import time
+        today = utc_today()
+        self.start_date = start_date or (today - timedelta(days=3)).isoformat()
+        self.end_date = end_date or today.isoformat()
+
+        # Heart rate endpoint takes ISO 8601 datetimes - fromisoformat is a C fast path, unlike strptime
+        self._hr_start = datetime.fromisoformat(self.start_date).isoformat()
+        self._hr_end = datetime.fromisoformat(self.end_date).isoformat()
 
         # Create Header
         self.header = {"Authorization": f"Bearer {key}"}
@@ -35,27 +43,28 @@ class OuraData:
         self.heart_rate_data = None
 
 
-    def pre_load_user_data(self) -> dict:
+    async def pre_load_user_data(self) -> dict:
         # Initialize HTTP GET Request Object
         self.httpReq = HttpGETDevice(Device.OURA_RING)
         # get data response from the past 3 days
-        result_data = self.query_execution()
+        result_data = await self.query_execution()
         return result_data
 
 
 
-    # Error Handling Update: 
-    # 1. If the request fails, retry 3 times
-    # 2. If the request fails after 3 retries, raise the error
-    # 3. If the request returns a non-HTTPException, return the data
+    # Error Handling:
+    # 1. 429/5xx responses are retried with backoff inside HttpGETDevice.send_request
+    # 2. If the request still fails after the final retry, the HTTPException is raised
+    # 3. Otherwise the data payload is returned
 
     # Execute Query to extract Sleep, Stress, and Heart Rate Data
-    def query_execution(self) -> dict:
+    # The three endpoints are independent, so they are requested concurrently
+    async def query_execution(self) -> dict:
         execution_strings = [SLEEPURL, STRESSURL, HRURL]
         response_keys = ["sleep_data", "stress_data", "heart_rate_data"]
-        result_data = {}
 
-        for index, unique_url in enumerate(execution_strings):
+        call_specs = []
+        for unique_url in execution_strings:
             # Create url variations based on the data being loaded
             url = BASEURL + unique_url
 
@@ -66,16 +75,18 @@ class OuraData:
                     'end_date': self.end_date
                 }
             else:
-                format = "%Y-%m-%d"
                 params = {
-                    'start_datetime': datetime.strptime(self.start_date, format),
-                    'end_datetime': datetime.strptime(self.end_date, format)
-            }
-
-            # content (dict) -> indicator for whether request succeeded or failed
-            content = self.httpReq.send_request(url, params, self.header)
-            result_data[response_keys[index]] = content
-        return result_data
+                    'start_datetime': self._hr_start,
+                    'end_datetime': self._hr_end
+                }
+            call_specs.append((url, params))
+
+        # content (dict) -> data payload, HTTPException from any call is re-raised by gather
+        contents = await asyncio.gather(*(
+            self.httpReq.send_request(url, params, self.header)
+            for url, params in call_specs
+        ))
+        return dict(zip(response_keys, contents))
 
 
 
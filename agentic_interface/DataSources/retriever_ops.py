@@ -1,36 +1,74 @@
 # Upload documents to Pinecone Database
 
 # Libraries
+from itertools import islice
+import uuid
 from pinecone import Pinecone
 from langchain_pinecone import PineconeVectorStore
-from langchain_huggingface import HuggingFaceEmbeddings
+from DataSources.embeddings import get_embeddings
 
 # Constants
 INDEX = 'podcastTranscripts'
+UPSERT_BATCH_SIZE = 100
+UPSERT_POOL_THREADS = 30
+
+def chunks(iterable, n):
+    # Yield successive n-sized tuples from any iterable without materializing it
+    it = iter(iterable)
+    chunk = tuple(islice(it, n))
+    while chunk:
+        yield chunk
+        chunk = tuple(islice(it, n))
 
 class PineconeClass:
     def __init__(self, key):
         try:
             # Initialize Pinecone client
             self.pc = Pinecone(api_key = key)
-            self.index = self.pc.Index(host = "https://ourahuberman-2qajcgl.svc.aped-4627-b74a.pinecone.io")
-            self.embeddings = HuggingFaceEmbeddings(model_name = 'sentence-transformers/bert-large-nli-stsb-mean-tokens')
+            self.index = self.pc.Index(
+                host = "https://ourahuberman-2qajcgl.svc.aped-4627-b74a.pinecone.io",
+                pool_threads = UPSERT_POOL_THREADS
+            )
+            # Shared embedder - same model as the query side in Agentic_RAG/tools.py, loaded once per process
+            self.embeddings = get_embeddings()
             self.vector_store = PineconeVectorStore(embedding = self.embeddings, index = self.index)
         except RuntimeError as r:
             # This is an internal endpoint - users do not need to provide any information
             # Build out further exceptions to handle connection errors, etc.
             raise RuntimeError("Pinecone Server Error")
 
-    def insert(self, docs):
-        _ = self.vector_store.add_documents(namespace = INDEX,documents = docs)
+    def insert_many(self, docs_iterable, batch_size = UPSERT_BATCH_SIZE):
+        # Stream documents through the embedder batch_size at a time - nothing holds the full corpus in memory
+        self.bulk_insert(self._embed_batches(docs_iterable, batch_size), batch_size)
 
-    def search(self, query):
-        index = self.index
+    def _embed_batches(self, docs_iterable, batch_size):
+        # Yield (id, vector, metadata) tuples one embedded batch at a time
+        # Metadata keeps the raw text under 'text' so search / PineconeVectorStore can read it back
+        for batch in chunks(docs_iterable, batch_size):
+            embs = self.embeddings.embed_documents([d.page_content for d in batch])
+            for doc, emb in zip(batch, embs):
+                yield str(uuid.uuid4()), emb, {**doc.metadata, "text": doc.page_content}
+
+    def bulk_insert(self, vectors, batch_size = UPSERT_BATCH_SIZE):
+        # Fire batches on the index's thread pool - .get() re-raises any upsert failure
+        # At most one batch per pool thread is in flight, so a streamed input never piles up in memory
+        with self.index as idx:
+            pending = []
+            for chunk in chunks(vectors, batch_size):
+                pending.append(idx.upsert(vectors = list(chunk), namespace = INDEX, async_req = True))
+                if len(pending) >= UPSERT_POOL_THREADS:
+                    for result in pending:
+                        result.get()
+                    pending.clear()
+            for result in pending:
+                result.get()
 
+    def search(self, query):
         # Convert query to vector space using embeddings model
         query_vec = self.embeddings.embed_query(query)
 
-        self.results = index.query(
+        # Results stay local so concurrent searches on one instance cannot overwrite each other
+        results = self.index.query(
             namespace = INDEX,
             vector = query_vec,
             top_k = 10,
@@ -39,15 +77,6 @@ class PineconeClass:
 
         # Return the documents and the query - note that this will not be returning any metadata
         return {
-            "documents": self.extract_text(),
+            "documents": [match['metadata']['text'] for match in results['matches']],
             "query": query
         }
-    
-    def extract_text(self):
-        # return array of only text
-        docs = [match['metadata']['text'] for match in self.results['matches']]
-        return docs
-
-    
-
-        
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Shared API Clients
+
+Process-wide HTTP and OpenAI clients. Each client owns a connection pool,
+so creating one per pipeline or per request pays fresh TCP/TLS handshakes
+on every call; importing these singletons keeps connections alive and
+reused across the eval pipeline and services.
+
+Usage:
+    from clients import openai_async
+    await openai_async.responses.create(...)
+"""
+
+import httpx
+from openai import AsyncOpenAI
+from config.settings import settings
+
+# Keep-alive pool shared by every outbound HTTP call
+# retries=3 retries failed connection attempts (not HTTP error responses)
+http_client = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        retries=3,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
+    ),
+    timeout=60,
+)
+
+# OpenAI client riding on the shared pool
+openai_async = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
@@ -5,15 +5,18 @@ Loads and validates environment variables using Pydantic.
 Provides type-safe access to configuration values.
 
 Environment variables are loaded from .env file in the project root.
+The .env file is read once per process - use get_settings() (or the
+module-level `settings` singleton) rather than instantiating Settings().
 
 Configuration categories:
 - OpenAI: API key for GPT-4 chat model
 - Pinecone: Vector database for RAG (embeddings, host, namespaces)
 - Database: PostgreSQL connection details for user data
-- Runtime: Local vs production mode flags
 """
 
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     """
@@ -32,20 +35,34 @@ class Settings(BaseSettings):
     PINECONE_NAMESPACE_2: str  # Secondary namespace (e.g., Goggins content)
     PINECONE_EMBEDDING_MODEL: str  # HuggingFace model for embeddings
     PINECONE_EMBEDDING_MODE: str  # "huggingface" or "pinecone_inference"
+    EMBEDDING_BACKEND: str = "torch"  # sentence-transformers backend: "torch" or "onnx" (needs optimum[onnxruntime])
+    EMBEDDING_ONNX_FILE: str | None = None  # ONNX weights inside the model repo, e.g. "onnx/model_qint8_avx512_vnni.onnx" for int8
 
     # Database Configuration
-    PUBLIC_IP: str  # PostgreSQL host IP (for local mode)
+    DATABASE_URL: str | None = None  # asyncpg DSN (e.g. Cloud SQL Auth Proxy socket) - overrides the fields below
+    PUBLIC_IP: str  # PostgreSQL host IP (used when DATABASE_URL is unset)
     DATABASE_NAME: str  # Name of the database
     DB_USERNAME: str  # Database username
     PASSWORD: str  # Database password
     DB_PORT: int  # Database port (default: 5432)
-    INSTANCE_CONNECTION_NAME: str  # GCP Cloud SQL instance name
-    LOCAL_MODE: str  # "true" for local, "false" for GCP
+    INSTANCE_CONNECTION_NAME: str | None = None  # GCP Cloud SQL instance name (for the Auth Proxy sidecar)
+    LOCAL_MODE: str | None = None  # Legacy flag - no longer read; kept so existing .env files still load
+    DB_POOL_MIN_SIZE: int = 2  # Warm connections kept open by the asyncpg pool
+    DB_POOL_MAX_SIZE: int = 10  # Upper bound on pooled connections per worker process
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements cached per connection - set 0 behind PgBouncer transaction pooling
+
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
+
 
-    class Config:
-        """Pydantic configuration"""
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide Settings instance
+
+    Parses the environment / .env file on first call only.
+    Call get_settings.cache_clear() to force a reload.
+    """
+    return Settings()
 
 # Singleton instance - import this in other modules
-settings = Settings()
+settings = get_settings()
@@ -8,20 +8,103 @@ Handles PostgreSQL operations for:
 - Feedback storage
 
 Connection Management:
-- LOCAL_MODE=true: Direct TCP connection to PostgreSQL
-- LOCAL_MODE=false: Google Cloud SQL Connector with IAM auth
+- DATABASE_URL set: asyncpg DSN, e.g. the Cloud SQL Auth Proxy socket
+  (postgres://user:pass@/dbname?host=/cloudsql/PROJECT:REGION:INSTANCE)
+- Otherwise: Direct TCP connection built from PUBLIC_IP/DB_PORT/DATABASE_NAME
 
-Uses pg8000 as the PostgreSQL driver (compatible with Cloud SQL Connector).
+Behind PgBouncer (pool_mode=transaction) point DATABASE_URL at the bouncer,
+set DB_STATEMENT_CACHE_SIZE=0 (server-side prepared statements do not
+survive across transactions there) and keep DB_POOL_MAX_SIZE small - the
+bouncer does the multiplexing across worker processes.
+
+Uses asyncpg as the PostgreSQL driver. A single connection pool is created
+on first use (or at app startup via open_pool) and shared by every query,
+so connection handshakes are not paid per call.
+
+Conversation logs are written off the request path: log_message enqueues the
+row and returns a client-generated UUID, and a background worker drains the
+queue into logging.logger_final. A failed batch is retried once before it is
+reported with its log_uuids.
+
+Schema changes live in MIGRATIONS and are applied with
+`python -m database.user_db_call migrate` (run before the server starts).
+The pool refuses to open against a schema that is missing them.
 
 Security Note: API keys are stored encrypted in database but passed
               plainly to agent context. Future work should use secure vaults.
 """
 
-from google.cloud.sql.connector import Connector, IPTypes
+import asyncio
+import asyncpg
+import logging
+import sys
+from cachetools import TTLCache
 from pydantic import BaseModel
 from logger import Logger
 from config.settings import settings
-import json
+from dataclasses import dataclass
+from datetime import datetime
+import orjson
+import uuid
+
+# Module logger - named log because log_message takes a `logger` (Logger entry) argument
+log = logging.getLogger(__name__)
+
+# Read-through cache settings - preferences and API keys change minutes-to-days apart
+CACHE_MAXSIZE = 10_000
+PREFERENCES_CACHE_TTL = 60  # seconds
+API_KEY_CACHE_TTL = 60  # seconds - bounds how long a rotated or removed device token is served
+_MISSING = object()  # cache-miss sentinel - None is a cached value (no preferences / no device key)
+
+# Background log writer settings
+LOG_QUEUE_MAXSIZE = 10_000
+LOG_BATCH_SIZE = 256  # max rows per executemany
+LOG_BATCH_WINDOW = 0.05  # seconds to wait for a batch to fill
+LOG_WRITE_ATTEMPTS = 2  # a failed batch is retried once before it is reported
+LOG_RETRY_DELAY = 1.0  # seconds between attempts
+
+# SQL statements - module constants so every call passes the identical string
+# and hits asyncpg's per-connection prepared statement cache
+LOGGER_TABLE = "logging.logger_final"
+SELECT_DEVICES_SQL = (
+    "SELECT d.key AS device_type, d.value->>'access_token' AS api_key "
+    "FROM users.users_staging u, jsonb_each(u.devices) AS d WHERE u.username = $1"
+)
+SELECT_PREFERENCES_SQL = "SELECT preferences FROM users.users_staging WHERE username = $1 LIMIT 1"
+SELECT_USER_CONTEXT_SQL = (
+    "SELECT preferences, devices->$2->>'access_token' AS api_key "
+    "FROM users.users_staging WHERE username = $1 LIMIT 1"
+)
+ADD_PREFERENCE_SQL = (
+    "UPDATE users.users_staging SET preferences = array_append(COALESCE(preferences, '{}'), $1) "
+    "WHERE username = $2 AND NOT COALESCE(preferences, '{}') @> ARRAY[$1]::text[]"
+)
+REMOVE_PREFERENCE_SQL = "UPDATE users.users_staging SET preferences = array_remove(preferences, $1) WHERE username = $2"
+SELECT_API_KEY_SQL = "SELECT devices->$1->>'access_token' FROM users.users_staging WHERE username = $2 LIMIT 1"
+SELECT_API_KEYS_SQL = (
+    "SELECT k.device_type, u.devices->k.device_type->>'access_token' AS access_token "
+    "FROM users.users_staging u, unnest($1::text[]) AS k(device_type) WHERE u.username = $2"
+)
+INSERT_LOG_SQL = (
+    f"INSERT INTO {LOGGER_TABLE} (log_uuid, timestamp, inference_time, prompt, response, response_metadata, feedback, preferred_response, message_history, system_prompt) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)"
+)
+CHECK_LOG_UUID_SQL = (
+    "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+    "WHERE table_schema = 'logging' AND table_name = 'logger_final' AND column_name = 'log_uuid')"
+)
+
+# Idempotent schema migrations, applied in order by migrate()
+MIGRATIONS = (
+    # Client-generated log id returned to the web app and used to attach feedback
+    f"ALTER TABLE {LOGGER_TABLE} ADD COLUMN IF NOT EXISTS log_uuid UUID UNIQUE",
+)
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block - applied one by one after MIGRATIONS
+CONCURRENT_MIGRATIONS = (
+    # Every lookup is by username (unique at registration) - index it without locking writes
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS users_staging_username_key ON users.users_staging (username)",
+)
+MIGRATE_COMMAND = "python -m database.user_db_call migrate"
 
 class UserDbTyping(BaseModel):
     """Type definition for user data structure"""
@@ -31,6 +114,50 @@ class UserDbTyping(BaseModel):
     devices: dict[str, str]  # device_type: api_key
     preferences: list[str]
 
+@dataclass(frozen=True)
+class UserContext:
+    """Per-request user context fetched in a single round-trip"""
+    preferences: list[str] | None  # None if the user has no preferences set
+    api_key: str | None  # Access token for the requested device
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """
+    Per-connection setup run by the pool
+
+    Registers orjson-backed JSON/JSONB codecs so dicts and lists can be passed
+    and returned directly instead of being serialized by hand. JSONB uses the
+    binary wire format (a 1-byte version header followed by the JSON text), so
+    the server does not have to re-parse a text literal on insert.
+    """
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=lambda value: b"\x01" + orjson.dumps(value),
+        decoder=lambda data: orjson.loads(data[1:]),
+        schema="pg_catalog",
+        format="binary"
+    )
+    await conn.set_type_codec(
+        "json",
+        encoder=lambda value: orjson.dumps(value).decode(),
+        decoder=orjson.loads,
+        schema="pg_catalog"
+    )
+
+def _connection_kwargs() -> dict:
+    """
+    asyncpg connection arguments - DATABASE_URL if set, else the TCP settings
+    """
+    if settings.DATABASE_URL:
+        return {"dsn": settings.DATABASE_URL}
+    return {
+        "host": settings.PUBLIC_IP,
+        "port": settings.DB_PORT,
+        "user": settings.DB_USERNAME,
+        "password": settings.PASSWORD,
+        "database": settings.DATABASE_NAME,
+    }
+
 class UserDbOperations:
     """
     Database operations for agent backend
@@ -40,53 +167,72 @@ class UserDbOperations:
     - Logging conversations
     - Storing feedback
     
-    Automatically handles connection management based on LOCAL_MODE setting.
+    Connects through DATABASE_URL when set, otherwise directly over TCP.
     """
     
     def __init__(self):
         """
-        Initialize database connection
-        
-        If running in production (LOCAL_MODE=false), creates Cloud SQL Connector.
-        If running locally (LOCAL_MODE=true), uses direct TCP connection.
+        Initialize database operations
+
+        The asyncpg pool must be created inside a running event loop,
+        so creation is deferred to open_pool. Connection and pool arguments
+        are resolved from settings here, once.
         """
-        if settings.LOCAL_MODE == 'false':
-            self.connector = Connector()  # Google Cloud SQL Connector
+        self._pool_kwargs = {
+            **_connection_kwargs(),
+            "min_size": settings.DB_POOL_MIN_SIZE,
+            "max_size": settings.DB_POOL_MAX_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "init": _init_connection,
+        }
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+        # Pending log rows, drained by _log_worker (started via start_log_worker)
+        self._log_queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+        self._log_worker_task = None
 
-        # Database table for conversation logs
-        self.logger_table = "logging.logger_final"
+        # In-process TTL caches for the hot read path
+        # preferences keyed by username, API keys keyed by (user_id, device_type)
+        self._preferences_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=PREFERENCES_CACHE_TTL)
+        self._api_key_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=API_KEY_CACHE_TTL)
 
-    async def _get_conn(self):
+    async def open_pool(self) -> asyncpg.Pool:
         """
-        Establish database connection based on environment
-        
+        Create the shared connection pool if it does not exist yet
+
         Returns:
-            pg8000 connection object
-        
-        Note: Connections should be closed after use to avoid connection pool exhaustion
+            asyncpg.Pool shared by every query on this instance
         """
-        if settings.LOCAL_MODE == "true":
-            # Local development: Direct TCP connection
-            import pg8000.dbapi as pgdb
-            return pgdb.connect(
-                user=settings.DB_USERNAME,
-                password=settings.PASSWORD,
-                host=settings.PUBLIC_IP,
-                port=int(settings.DB_PORT),
-                database=settings.DATABASE_NAME
-            )
-        else:
-            # Production: Cloud SQL Connector with IAM auth
-            return self.connector.connect(
-                settings.INSTANCE_CONNECTION_NAME,
-                "pg8000",
-                db=settings.DATABASE_NAME,
-                user=settings.DB_USERNAME,
-                password=settings.PASSWORD,
-                ip_type=IPTypes.PUBLIC
-            )
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await self._create_pool()
+        return self._pool
+
+    async def _create_pool(self) -> asyncpg.Pool:
+        """
+        Build the asyncpg pool and verify the schema it will write to
+
+        In production DATABASE_URL points at the Cloud SQL Auth Proxy, which
+        handles IAM auth and TLS once per server connection (and can sit in
+        front of Cloud SQL managed connection pooling).
+
+        Raises:
+            RuntimeError: if MIGRATIONS have not been applied - every log
+                insert would fail, so the server should not start
+        """
+        pool = await asyncpg.create_pool(**self._pool_kwargs)
+        try:
+            async with pool.acquire() as conn:
+                if not await conn.fetchval(CHECK_LOG_UUID_SQL):
+                    raise RuntimeError(f"{LOGGER_TABLE}.log_uuid is missing - run `{MIGRATE_COMMAND}` before starting the server")
+        except BaseException:
+            await pool.close()
+            raise
+        return pool
     
-    async def get_device_information(self, username: str) -> tuple[dict[str, str]]:
+    async def get_device_information(self, username: str) -> list[asyncpg.Record]:
         """
         Retrieve user's connected wearable devices and API keys
         
@@ -94,25 +240,18 @@ class UserDbOperations:
             username: User's username
         
         Returns:
-            tuple: List of (device_type, api_key) tuples for all user devices
+            list: (device_type, api_key) records for all user devices
         
         Example:
             [('Oura Ring', 'ABC123...'), ('Apple Watch', 'XYZ789...')]
         """
-        conn = await self._get_conn()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT device_type, api_key FROM users.users_staging WHERE username = $1", 
-                [username]
-            )
-            device_information = cursor.fetchall()
-            return device_information
-        finally:
-            cursor.close()
-            conn.close()
+        pool = await self.open_pool()
+        async with pool.acquire() as conn:
+            # devices is a JSONB object keyed by device type - expand it to one row per device
+            device_information = await conn.fetch(SELECT_DEVICES_SQL, username)
+        return device_information
     
-    async def get_agentic_preferences(self, username: str) -> list[list[str]]:
+    async def get_agentic_preferences(self, username: str) -> list[str] | None:
         """
         Fetch user's health preferences for personalized responses
         
@@ -125,27 +264,57 @@ class UserDbOperations:
             username: User's username
         
         Returns:
-            list: Nested list containing user preferences
-                 Returns None if user has no preferences set
+            list: The user's preferences
+                 Returns None if the user does not exist or has no preferences set
+        
+        Results are cached for PREFERENCES_CACHE_TTL seconds and invalidated
+        when preferences are added or removed through this class.
         """
-        conn = await self._get_conn()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT preferences FROM users.users_staging WHERE username = $1", 
-                [username]
-            )
-            preferences = cursor.fetchone()
+        preferences = self._preferences_cache.get(username, _MISSING)
+        if preferences is not _MISSING:
+            return preferences
+
+        pool = await self.open_pool()
+        async with pool.acquire() as conn:
+            preferences = await conn.fetchval(SELECT_PREFERENCES_SQL, username)
+            self._preferences_cache[username] = preferences
             return preferences
-        finally:
-            cursor.close()
-            conn.close()
+
+    async def get_user_context(self, username: str, device_type: str) -> UserContext:
+        """
+        Fetch preferences and a device API key together
+
+        Agent turns need both values for the same user, so they are read in one
+        query instead of two sequential round-trips. Both caches are consulted
+        first and refreshed from the combined row on a miss.
+
+        Args:
+            username: User's username
+            device_type: Device whose access token is needed (e.g. "Oura Ring")
+
+        Returns:
+            UserContext: preferences and api_key (None where not available)
+        """
+        preferences = self._preferences_cache.get(username, _MISSING)
+        api_key = self._api_key_cache.get((username, device_type), _MISSING)
+
+        if preferences is _MISSING or api_key is _MISSING:
+            pool = await self.open_pool()
+            async with pool.acquire() as conn:
+                row = await conn.fetchrow(SELECT_USER_CONTEXT_SQL, username, device_type)
+            preferences = row["preferences"] if row is not None else None
+            api_key = row["api_key"] if row is not None else None
+            self._preferences_cache[username] = preferences
+            self._api_key_cache[(username, device_type)] = api_key
+
+        return UserContext(preferences=preferences, api_key=api_key)
 
     async def add_agentic_preference(self, username: str, preference: str) -> str:
         """
         Add a new preference to user's profile
         
-        Uses PostgreSQL array concatenation (||) to append to existing list.
+        Uses array_append, skipping the write when the preference is already
+        present so the list never holds duplicates.
         
         Args:
             username: User's username
@@ -154,106 +323,212 @@ class UserDbOperations:
         Returns:
             str: Success message
         """
-        conn = await self._get_conn()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "UPDATE users.users_staging SET preferences = preferences || $1 WHERE username = $2", 
-                [preference, username]
-            )
-            conn.commit()
-            return "Preference added successfully"
-        finally:
-            cursor.close()
-            conn.close()
+        pool = await self.open_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(ADD_PREFERENCE_SQL, preference, username)
+            self._preferences_cache.pop(username, None)
         return "Preference added successfully"
 
     async def remove_agentic_preference(self,username: str, preference: str) -> str:
-        conn = await self._get_conn()
-        cursor = conn.cursor()
-        try:
+        pool = await self.open_pool()
+        async with pool.acquire() as conn:
             # Preferences will be stored as a list of strings
             # it would be a preference list - so we need to remove it from the list
-            cursor.execute("UPDATE users.users_staging SET preferences = array_remove(preferences,$1) WHERE username = $2", [preference, username])
-            conn.commit()
-        finally:
-            # close connection
-            cursor.close()
-            conn.close()
+            await conn.execute(REMOVE_PREFERENCE_SQL, preference, username)
+            self._preferences_cache.pop(username, None)
         return "Preference removed successfully"
 
     async def get_api_key(self, user_id: str, device_type: str) -> str:
-        conn = await self._get_conn()
-        cursor = conn.cursor()
-        try:
-        # Get the API key for the user - query via the user_db_call class
-            cursor.execute("SELECT devices->$1->>'access_token' FROM users.users_staging WHERE username = $2", [device_type, user_id])
-            access_token = cursor.fetchone()
-            return access_token[0]
-        finally:
-            cursor.close()
-            conn.close()
-
-    async def log_message(self, logger: Logger) -> tuple[int]:
-        conn = await self._get_conn()
-        cursor = conn.cursor()
+        # Served from cache for up to API_KEY_CACHE_TTL seconds - the web app writes tokens straight to
+        # the database, so a refreshed, added or removed device is picked up once the entry expires
+        cache_key = (user_id, device_type)
+        access_token = self._api_key_cache.get(cache_key, _MISSING)
+        if access_token is not _MISSING:
+            return access_token
+
+        pool = await self.open_pool()
+        async with pool.acquire() as conn:
+            # Get the API key for the user - query via the user_db_call class
+            access_token = await conn.fetchval(SELECT_API_KEY_SQL, device_type, user_id)
+            self._api_key_cache[cache_key] = access_token
+            return access_token
+
+    async def get_api_keys(self, user_id: str, device_types: list[str]) -> dict[str, str | None]:
+        """
+        Fetch access tokens for several devices in one round-trip
+
+        Use instead of calling get_api_key in a loop. Cached keys are served
+        from the same cache as get_api_key; only the misses are queried.
+
+        Args:
+            user_id: User's username
+            device_types: Devices whose access tokens are needed
+
+        Returns:
+            dict: device_type -> access token (None if the device is not connected)
+        """
+        api_keys = {}
+        missing = []
+        for device_type in device_types:
+            access_token = self._api_key_cache.get((user_id, device_type), _MISSING)
+            if access_token is _MISSING:
+                missing.append(device_type)
+            else:
+                api_keys[device_type] = access_token
+
+        if missing:
+            pool = await self.open_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(SELECT_API_KEYS_SQL, missing, user_id)
+            for device_type, access_token in rows:
+                api_keys[device_type] = access_token
+
+        # Unknown user: no rows come back
+        # Devices without a key are cached as None too, so they are not re-queried every turn
+        for device_type in missing:
+            self._api_key_cache[(user_id, device_type)] = api_keys.setdefault(device_type, None)
+        return api_keys
+
+    def log_message(self, logger: Logger) -> str:
+        """
+        Queue a conversation log for the background writer
+
+        The INSERT happens later in _log_worker, so the response is not held
+        up by the database commit. If the queue is full the oldest pending
+        row is dropped to make room.
+
+        Args:
+            logger: Complete log entry for the conversation turn
+
+        Returns:
+            str: log_uuid of the queued row (used by the web app to attach feedback)
+        """
+        log_uuid = uuid.uuid4()
+        row = (
+            log_uuid, datetime.fromisoformat(logger.timestamp), logger.inference_time, logger.prompt, logger.response,
+            logger.response_metadata, logger.feedback, logger.preferred_response, logger.message_history, logger.system_prompt
+        )
         try:
-            # Log the message to the database
-            cursor.execute(f"INSERT INTO {self.logger_table} (timestamp, inference_time, prompt, response, response_metadata, feedback, preferred_response, message_history, system_prompt) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id", [logger.timestamp, logger.inference_time, json.dumps(logger.prompt), json.dumps(logger.response), json.dumps(logger.response_metadata), logger.feedback, logger.preferred_response, json.dumps(logger.message_history), logger.system_prompt])
-            conn.commit()
-            id = cursor.fetchone()
-            return id
-        finally:
-            # close connection
-            cursor.close()
-            conn.close()
+            self._log_queue.put_nowait(row)
+        except asyncio.QueueFull:
+            dropped = self._log_queue.get_nowait()
+            self._log_queue.task_done()
+            log.warning("Log queue full - dropped oldest pending log row %s", dropped[0])
+            self._log_queue.put_nowait(row)
+        return str(log_uuid)
 
-    def close_connection(self):
-        if self.connector:
-            self.connector.close()
+    def start_log_worker(self) -> None:
+        """
+        Start the background task that writes queued logs (call once at startup)
+        """
+        if self._log_worker_task is None:
+            self._log_worker_task = asyncio.create_task(self._log_worker())
 
+    async def _log_worker(self) -> None:
+        """
+        Drain the log queue in batches
 
-# DEV TOOL - ONLY USED FOR TABLE INIT   
-def create_user_db_tables():
-    with open('../config/gcp_db.yaml', 'r') as file:
-        config = yaml.safe_load(file)
-
-    PUBLIC_IP = settings.PUBLIC_IP
-    DATABASE_NAME = settings.DATABASE_NAME
-    USERNAME = settings.DB_USERNAME
-    PASSWORD = settings.PASSWORD
-    PORT = settings.DB_PORT
-
-    connector = Connector()
-
-    # Initialize the COnnectino
-    conn = connector.connect(
-        host=PUBLIC_IP,
-        db=DATABASE_NAME,
-        user=USERNAME,
-        password=PASSWORD,
-        port=PORT,
-        ip_type=IPTypes.PUBLIC
-    )
+        Collects up to LOG_BATCH_SIZE rows, or whatever arrives within
+        LOG_BATCH_WINDOW of the first one, and writes them with a single
+        executemany inside one transaction - one commit (fsync) per batch
+        instead of one per conversation turn. A failed batch is rolled back
+        and retried once; if that fails too, the error is logged with the
+        affected log_uuids.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            rows = [await self._log_queue.get()]
+            deadline = loop.time() + LOG_BATCH_WINDOW
+            while len(rows) < LOG_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(self._log_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
 
-    cursor = conn.cursor()
+            try:
+                for attempt in range(1, LOG_WRITE_ATTEMPTS + 1):
+                    try:
+                        await self._write_log_rows(rows)
+                        break
+                    except Exception:
+                        if attempt < LOG_WRITE_ATTEMPTS:
+                            log.warning("Failed to write %d log rows - retrying", len(rows), exc_info=True)
+                            await asyncio.sleep(LOG_RETRY_DELAY)
+                        else:
+                            log.exception(
+                                "Dropped %d log rows after %d attempts: %s",
+                                len(rows), LOG_WRITE_ATTEMPTS, [str(row[0]) for row in rows]
+                            )
+            finally:
+                for _ in rows:
+                    self._log_queue.task_done()
 
-    # Create a Schema for the users
-    # cursor.execute("CREATE SCHEMA IF NOT EXISTS users")
-    # cursor.execute("CREATE TABLE IF NOT EXISTS users.users_staging (id SERIAL PRIMARY KEY, username VARCHAR(255), password VARCHAR(255), preferences TEXT[], devices JSONB, first_name VARCHAR(255), last_name VARCHAR(255))")
+    async def _write_log_rows(self, rows: list[tuple]) -> None:
+        """
+        Insert one batch of log rows in a single transaction
+        """
+        pool = await self.open_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # JSONB columns are encoded by the connection codec
+                await conn.executemany(INSERT_LOG_SQL, rows)
+
+    async def close_connection(self):
+        if self._log_worker_task is not None:
+            # Flush pending logs before the pool goes away
+            await self._log_queue.join()
+            self._log_worker_task.cancel()
+            self._log_worker_task = None
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+# DEV TOOL - ONLY USED FOR TABLE INIT   
+async def create_user_db_tables():
+    # Same connection settings as the app pool
+    conn = await asyncpg.connect(**_connection_kwargs())
 
+    try:
+        # Create a Schema for the users
+        # await conn.execute("CREATE SCHEMA IF NOT EXISTS users")
+        # await conn.execute("CREATE TABLE IF NOT EXISTS users.users_staging (id SERIAL PRIMARY KEY, username VARCHAR(255), password VARCHAR(255), preferences TEXT[], devices JSONB, first_name VARCHAR(255), last_name VARCHAR(255))")
 
-    # Create a Schema for Logging
-    cursor.execute("CREATE SCHEMA IF NOT EXISTS logging")
-    # Create a table for the users
-    # Create a table for the logging
-    # check the types
-    cursor.execute("CREATE TABLE IF NOT EXISTS logging.logger_final (id SERIAL PRIMARY KEY, timestamp TIMESTAMP, inference_time FLOAT, prompt JSONB, response JSONB, response_metadata JSONB, feedback TEXT, preferred_response TEXT, message_history JSONB, system_prompt TEXT)")
-    # Commit the changes
-    conn.commit()
-    conn.close()
-    cursor.close()
+        for statement in CONCURRENT_MIGRATIONS:
+            await conn.execute(statement)
+
+        # Create a Schema for Logging
+        await conn.execute("CREATE SCHEMA IF NOT EXISTS logging")
+        # Create a table for the logging
+        await conn.execute("CREATE TABLE IF NOT EXISTS logging.logger_final (id SERIAL PRIMARY KEY, log_uuid UUID UNIQUE, timestamp TIMESTAMP, inference_time FLOAT, prompt JSONB, response JSONB, response_metadata JSONB, feedback TEXT, preferred_response TEXT, message_history JSONB, system_prompt TEXT)")
+    finally:
+        await conn.close()
     return "Tables created successfully"
 
+async def migrate():
+    """
+    Apply MIGRATIONS to an existing database in one transaction, then
+    CONCURRENT_MIGRATIONS outside it (autocommit, one statement at a time)
+
+    Safe to run on every deploy - each statement is idempotent.
+    """
+    conn = await asyncpg.connect(**_connection_kwargs())
+    try:
+        async with conn.transaction():
+            for statement in MIGRATIONS:
+                await conn.execute(statement)
+        for statement in CONCURRENT_MIGRATIONS:
+            await conn.execute(statement)
+    finally:
+        await conn.close()
+    return f"Applied {len(MIGRATIONS) + len(CONCURRENT_MIGRATIONS)} migrations"
+
 if __name__ == "__main__":
-    create_user_db_tables()
+    # `migrate` upgrades an existing schema; no argument runs the dev table init
+    if sys.argv[1:] == ["migrate"]:
+        print(asyncio.run(migrate()))
+    else:
+        asyncio.run(create_user_db_tables())
@@ -11,15 +11,45 @@ if str(_agentic_interface) not in sys.path:
     sys.path.insert(0, str(_agentic_interface))
 
 from Agentic_RAG.agent import AgenticRAG
-from Agentic_RAG.tools import get_Andrew_Huberman_Insights
+from Agentic_RAG.tools import get_huberman_passages
 import json
+import orjson
 import os
+import mmap
+import uuid
 import asyncio
-from openai import OpenAI, AsyncOpenAI
+import uvloop
+import openai
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from datetime import datetime
+from functools import lru_cache
 from abc import abstractmethod
 from tqdm import tqdm
 from config.settings import settings
+from clients import http_client, openai_async
+
+# Judge calls are retried on rate limits / transient API failures before the case is marked failed
+JUDGE_MAX_ATTEMPTS = 5
+JUDGE_RETRY_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# Batch API judging (run_evals_batch) - below BATCH_MIN_ROWS the queueing delay outweighs the savings
+BATCH_MIN_ROWS = 50
+BATCH_POLL_INTERVAL = 30  # seconds between batches.retrieve calls
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+@lru_cache(maxsize=None)
+def _read_text(file_path: str) -> str:
+    """Read a prompt file once per process - every eval instance shares the same text."""
+    with open(file_path, "r") as file:
+        return file.read()
+
+def _load_jsonl(path: str) -> list[dict]:
+    """Parse a JSONL file, reading lines straight out of a memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [orjson.loads(line) for line in iter(mm.readline, b"") if line.strip()]
 
 # ---------------------------------------------------------------------------
 # Base: shared state, loaders, parse_case, config, run_evals interface
@@ -35,33 +65,28 @@ class BaseEvalPipeline:
         self.input_arr = self._load_evals_data(evals_data_path)
         self.user_id = "trivedi.nik"
         self.system_instructions = self._load_system_instructions(system_instructions_path)
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = openai_async  # process-wide client - pipelines share one connection pool
         self.llm_type = 'gpt-4o'
+        # Set by run_evals_batch: pending (custom_id, body, future) judge requests
+        self._judge_batch = None
+        # Stage limits - agent runs and judge calls hit different rate limits, so each
+        # stage gets its own cap (run_evals / run_evals_batch reset these per run)
+        self._agent_sem = asyncio.Semaphore(5)
+        self._judge_sem = asyncio.Semaphore(5)
 
     def _load_evals_data(self, file_path: str) -> list[dict]:
-        rows = []
-        with open(file_path, "r") as file:
-            for line in file:
-                line = line.strip()
-                if line:
-                    rows.append(json.loads(line))
-        return rows
+        return _load_jsonl(file_path)
 
     def _load_system_instructions(self, file_path: str) -> str:
-        with open(file_path, "r") as file:
-            return file.read()
+        return _read_text(file_path)
 
     def _parse_case(self, input_case: dict) -> tuple[str, list[str], list[str]]:
         """Extract latest_query, user_history, ai_history from a test case."""
         messages = input_case["messages"]
         latest_query = messages[-1]["content"]
-        user_history = []
-        ai_history = []
-        for msg in messages[:-1]:
-            if msg["role"] == "user":
-                user_history.append(msg["content"])
-            else:
-                ai_history.append(msg["content"])
+        history = messages[:-1]
+        user_history = [msg["content"] for msg in history if msg["role"] == "user"]
+        ai_history = [msg["content"] for msg in history if msg["role"] != "user"]
         return latest_query, user_history, ai_history
 
     def _get_config(self, input_case: dict) -> dict:
@@ -73,21 +98,166 @@ class BaseEvalPipeline:
             "recursion_limit": 10,
         }
     
-    async def run_evals(self, concurrent_evals: int = 5, output_file_path: str = "evals/evals_results.jsonl") -> dict:
-        sem = asyncio.Semaphore(concurrent_evals)
-        total_correct = 0
-        total = 0
-
-        async def bounded(case):
-            async with sem:
-                return await self.one_case_eval(case)
-
-        tasks = [asyncio.create_task(bounded(c)) for c in self.input_arr]
-        with tqdm(total=len(tasks), unit="eval", desc="Eval") as pbar:
-            with open(output_file_path, "w") as f:
+    async def _run_agent(self, *args, **kwargs) -> dict:
+        """Run the agent for one case, holding an agent-stage slot only for the agent call itself."""
+        async with self._agent_sem:
+            return await self.agent.run(*args, **kwargs)
+
+    async def _judge(self, instructions: str, prompt: str, schema: dict, name: str) -> dict:
+        """
+        Run one LLM-as-judge call with a strict JSON schema and return the parsed verdict.
+
+        instructions carries the static rubric (identical for every case, so it
+        forms a cacheable prompt prefix server-side); prompt carries only the
+        per-case inputs.
+        """
+        body = {
+            "model": self.llm_type,
+            "instructions": instructions,
+            "input": prompt,
+            "text": {
+                "format": {
+                    "type": "json_schema",
+                    "schema": schema,
+                    "name": name,
+                    "strict": True,
+                }
+            },
+        }
+        if self._judge_batch is not None:
+            return await self._defer_judge(body)
+
+        async with self._judge_sem:
+            async for attempt in AsyncRetrying(
+                reraise=True,
+                stop=stop_after_attempt(JUDGE_MAX_ATTEMPTS),
+                wait=wait_exponential_jitter(initial=1, max=30),
+                retry=retry_if_exception_type(JUDGE_RETRY_ERRORS),
+            ):
+                with attempt:
+                    judge_response = await self.client.responses.create(**body)
+        return orjson.loads(judge_response.output[0].content[0].text)
+
+    async def _defer_judge(self, body: dict) -> dict:
+        """Queue a judge request for the next Batch API submission and wait for its verdict."""
+        future = asyncio.get_running_loop().create_future()
+        self._judge_batch.append((uuid.uuid4().hex, body, future))
+        return await future
+
+    async def _submit_judge_batch(self, requests: list[tuple[str, dict, asyncio.Future]], poll_interval: float) -> None:
+        """Upload queued judge requests as one Batch API job, wait for it, and resolve each request's future."""
+        futures = {custom_id: future for custom_id, _, future in requests}
+        batch_input = b"\n".join(
+            orjson.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/responses", "body": body})
+            for custom_id, body, _ in requests
+        )
+        try:
+            input_file = await self.client.files.create(file=("judge_batch.jsonl", batch_input), purpose="batch")
+            batch = await self.client.batches.create(
+                input_file_id=input_file.id, endpoint="/v1/responses", completion_window="24h",
+            )
+            print(f"Submitted judge batch {batch.id} ({len(requests)} requests)")
+            while batch.status not in BATCH_TERMINAL_STATUSES:
+                await asyncio.sleep(poll_interval)
+                batch = await self.client.batches.retrieve(batch.id)
+
+            if batch.output_file_id:
+                output = await self.client.files.content(batch.output_file_id)
+                for line in output.text.splitlines():
+                    row = orjson.loads(line)
+                    future = futures.pop(row["custom_id"], None)
+                    if future is None:
+                        continue
+                    response = row.get("response") or {}
+                    try:
+                        if response.get("status_code") != 200:
+                            raise RuntimeError(f"Judge request failed: {row.get('error') or response.get('body')}")
+                        future.set_result(orjson.loads(response["body"]["output"][0]["content"][0]["text"]))
+                    except Exception as e:
+                        future.set_exception(e)
+            missing_error = RuntimeError(f"Judge batch {batch.id} ended with status {batch.status}; no result returned")
+        except Exception as e:
+            missing_error = e
+        for future in futures.values():
+            future.set_exception(missing_error)
+
+    async def run_evals_batch(
+        self,
+        concurrent_evals: int = 5,
+        output_file_path: str = "evals/evals_results.jsonl",
+        poll_interval: float = BATCH_POLL_INTERVAL,
+        resume: bool = False,
+    ) -> dict:
+        """
+        Same as run_evals, but judge calls are submitted through the OpenAI Batch API
+
+        Cases run until they reach a judge call and park there; once every
+        unfinished case is parked, the queued requests go out as one batch
+        (half the per-token cost, up to 24h turnaround). Cases that judge
+        more than once (ToolTracesEval) take one batch round per call.
+        Small eval sets fall back to run_evals.
+        """
+        cases, done = self._resume_state(output_file_path, resume)
+        if len(cases) < BATCH_MIN_ROWS:
+            return await self.run_evals(concurrent_evals, output_file_path, resume)
+
+        self._agent_sem = asyncio.Semaphore(concurrent_evals)
+        self._judge_batch = []
+
+        tasks = [asyncio.create_task(self.one_case_eval(c)) for c in cases]
+        collector = asyncio.create_task(self._collect_results(tasks, output_file_path, done))
+        try:
+            while not collector.done():
+                unfinished = sum(not task.done() for task in tasks)
+                if self._judge_batch and len(self._judge_batch) == unfinished:
+                    requests, self._judge_batch = self._judge_batch, []
+                    await self._submit_judge_batch(requests, poll_interval)
+                else:
+                    await asyncio.sleep(0.1)
+            return await collector
+        finally:
+            self._judge_batch = None
+
+    async def run_evals(
+        self,
+        concurrent_evals: int = 5,
+        output_file_path: str = "evals/evals_results.jsonl",
+        resume: bool = False,
+        concurrent_judges: int | None = None,
+    ) -> dict:
+        """
+        Run every case and write results to output_file_path
+
+        Cases flow through two independently limited stages: at most
+        concurrent_evals agent runs and concurrent_judges judge calls
+        (defaults to concurrent_evals) are in flight at once. A case frees
+        its agent slot as soon as the agent returns, so the next agent run
+        overlaps with the previous case's judging.
+        """
+        self._agent_sem = asyncio.Semaphore(concurrent_evals)
+        self._judge_sem = asyncio.Semaphore(concurrent_judges or concurrent_evals)
+        cases, done = self._resume_state(output_file_path, resume)
+
+        tasks = [asyncio.create_task(self.one_case_eval(c)) for c in cases]
+        return await self._collect_results(tasks, output_file_path, done)
+
+    def _resume_state(self, output_file_path: str, resume: bool) -> tuple[list[dict], list[dict]]:
+        """Split input cases into (still to run, already written) when resuming from an existing results file."""
+        if not resume or not os.path.exists(output_file_path):
+            return self.input_arr, []
+        done = _load_jsonl(output_file_path)
+        done_ids = {result["id"] for result in done}
+        return [case for case in self.input_arr if case["id"] not in done_ids], done
+
+    async def _collect_results(self, tasks: list[asyncio.Task], output_file_path: str, done: list[dict] = ()) -> dict:
+        """Append case results to JSONL as they complete (one line each) and return the aggregate totals."""
+        total_correct = sum(result.get("correct", 0) for result in done)
+        total = sum(result.get("total", 0) for result in done)
+        with tqdm(total=len(tasks) + len(done), initial=len(done), unit="eval", desc="Eval") as pbar:
+            with open(output_file_path, "ab" if done else "wb") as f:
                 for case_result in asyncio.as_completed(tasks):
                     result = await case_result
-                    f.write(json.dumps(result) + "\n")
+                    f.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
                     f.flush()
                     total_correct += result.get("correct", 0)
                     total += result.get("total", 0)
@@ -114,15 +284,8 @@ INPUTS:
 - Tools Available: {tools_available}
 - Expected processes by query type (use to assess if the tool call aligns with the intended workflow):
 {tool_processes}
-- Today's date: {today_date} it is acceptable for queries asking about last week or last month data to start from today's date.
-
-
-USER QUERY: {query}
-
-Full tool trace for this episode (ordered):
-{tool_full_trace}
-
-Tool call under evaluation (judge only this call given the trace above): {current_tool_display}
+- Today's date (given with the query): it is acceptable for queries asking about last week or last month data to start from today's date.
+- The user query, the full tool trace, and the tool call under evaluation are given in the input.
 
 RULES (highest priority first):
 R1. If tool_name == "get_Andrew_Huberman_Insights" AND there exists ANY prior tool call in this trace that is a valid data acquisition tool for the query (e.g., get_sleep_data, get_activity_data, etc.), THEN output {{"correct": true, ...}}.
@@ -208,6 +371,22 @@ Keep in mind that we are evaluating tool calls and arguments not necessarily the
 """
 
 
+# Tools and processes never change between calls - the whole rubric is rendered once
+TOOL_TRACES_JUDGE_INSTRUCTIONS = TOOL_TRACES_JUDGE_PROMPT.format(
+    tools_available=TOOLS_AVAILABLE,
+    tool_processes=PROCESSES,
+)
+
+TOOL_TRACES_JUDGE_INPUT = """Today's date: {today_date}
+
+USER QUERY: {query}
+
+Full tool trace for this episode (ordered):
+{tool_full_trace}
+
+Tool call under evaluation (judge only this call given the trace above): {current_tool_display}"""
+
+
 class ToolTracesEval(BaseEvalPipeline):
     """Evaluate tool-calling accuracy via LLM-as-judge. Uses response.get('tool_calls', [])."""
     def __init__(self, eval_data_path: str = "evals/pulsy_evals_v1.jsonl", system_instructions_path: str = "Agentic_RAG/system_prompts/system_instructions_v2.md", unique_eval_path: str = None):
@@ -220,7 +399,7 @@ class ToolTracesEval(BaseEvalPipeline):
         latest_query, user_history, ai_history = self._parse_case(input_case)
         config = self._get_config(input_case)
         try:
-            response = await self.agent.run(
+            response = await self._run_agent(
                 latest_query, self.user_id, user_history, ai_history,
                 eval_mode=True, config=config,
             )
@@ -236,6 +415,7 @@ class ToolTracesEval(BaseEvalPipeline):
         }
         tool_calls = response.get("tool_calls", [])
         case_correct = 0
+        today_date = datetime.now().strftime("%Y-%m-%d")
 
         if not tool_calls:
             # If the tool call is empty - we have to evaluate whether the query is related to the scope of the tools available and outside the scope of the system instructions.
@@ -243,30 +423,15 @@ class ToolTracesEval(BaseEvalPipeline):
             # If it is not - we should mark the case as incorrect.
             tool_full_trace_str = "(no tool calls)"
             current_tool_display = "(no tool calls)"
-            prompt = TOOL_TRACES_JUDGE_PROMPT.format(
+            prompt = TOOL_TRACES_JUDGE_INPUT.format(
                 query=latest_query,
                 tool_full_trace=tool_full_trace_str,
                 current_tool_display=current_tool_display,
-                tool_processes=PROCESSES,
-                today_date=datetime.now().strftime("%Y-%m-%d"),
-                tools_available=TOOLS_AVAILABLE,
+                today_date=today_date,
             )
 
             try:
-                judge_response = await self.client.responses.create(
-                    model=self.llm_type,
-                    input=prompt,
-                    text={
-                        "format": {
-                            "type": "json_schema",
-                            "schema": TOOL_TRACES_JUDGE_SCHEMA,
-                            "name": "tool_judge",
-                            "strict": True,
-                        }
-                    },
-                )
-                text = judge_response.output[0].content[0].text
-                parsed = json.loads(text)
+                parsed = await self._judge(TOOL_TRACES_JUDGE_INSTRUCTIONS, prompt, TOOL_TRACES_JUDGE_SCHEMA, "tool_judge")
                 if parsed.get("correct"):
                     case_correct = 1
                 tool_call_judgment = {
@@ -318,29 +483,14 @@ class ToolTracesEval(BaseEvalPipeline):
             else:
                 args_str = str(args)
             current_tool_display = f"Call {idx + 1} of {len(tool_calls)}: {name}({args_str})"
-            prompt = TOOL_TRACES_JUDGE_PROMPT.format(
+            prompt = TOOL_TRACES_JUDGE_INPUT.format(
                 query=latest_query,
                 tool_full_trace=tool_full_trace_str,
                 current_tool_display=current_tool_display,
-                tool_processes=PROCESSES,
-                today_date=datetime.now().strftime("%Y-%m-%d"),
-                tools_available=TOOLS_AVAILABLE,
+                today_date=today_date,
             )
             try:
-                judge_response = await self.client.responses.create(
-                    model=self.llm_type,
-                    input=prompt,
-                    text={
-                        "format": {
-                            "type": "json_schema",
-                            "schema": TOOL_TRACES_JUDGE_SCHEMA,
-                            "name": "tool_judge",
-                            "strict": True,
-                        }
-                    },
-                )
-                text = judge_response.output[0].content[0].text
-                parsed = json.loads(text)
+                parsed = await self._judge(TOOL_TRACES_JUDGE_INSTRUCTIONS, prompt, TOOL_TRACES_JUDGE_SCHEMA, "tool_judge")
                 if parsed.get("correct"):
                     case_correct += 1
                 tool_call_judgments.append({
@@ -364,18 +514,18 @@ class ToolTracesEval(BaseEvalPipeline):
 # Subclass 2: Precision@3 via direct retriever (no agent run)
 # ---------------------------------------------------------------------------
 
-PRECISION_JUDGE_PROMPT = """You are an impartial judge. Given a user query and a list of retrieved passages (from a knowledge base), determine how many of the passages are relevant to answering the query.
-
-User query: {query}
-
-Passages (one per line, format "Source: ..., Text: ..."):
-{passages}
+PRECISION_JUDGE_INSTRUCTIONS = """You are an impartial judge. Given a user query and a list of retrieved passages (from a knowledge base), determine how many of the passages are relevant to answering the query.
 
 Instructions:
 1. Count how many of these passages (0, 1, 2, or 3) are relevant to the query. Set relevant_count to that integer.
 2. If relevant_count < 3 (i.e. at least one passage is not relevant or no passages are relevant), you MUST provide a brief reason explaining why the retrieved passages were not fully relevant (e.g. which passage(s) are off-topic and why, or how the query was not well addressed).
 3. If all 3 passages are relevant, no need to provide a reason"""
 
+PRECISION_JUDGE_PROMPT = """User query: {query}
+
+Passages (one per line, format "Source: ..., Text: ..."):
+{passages}"""
+
 PRECISION_JUDGE_SCHEMA = {
     "type": "object",
     "properties": {
@@ -396,7 +546,7 @@ def _parse_huberman_passages(content: str) -> list[str]:
 
 
 class PrecisionAt3RetrieverEval(BaseEvalPipeline):
-    """Precision@3 by calling get_Andrew_Huberman_Insights directly; LLM judge relevance."""
+    """Precision@3 on Pinecone's raw top 3 (get_huberman_passages, no agent-side dedup/budget); LLM judge relevance."""
     def __init__(self, eval_data_path: str = "evals/pulsy_evals_v1.jsonl", system_instructions_path: str = "Agentic_RAG/system_prompts/system_instructions_v2.md", unique_eval_path: str = None):
         super().__init__(unique_eval_path or eval_data_path, system_instructions_path)
 
@@ -404,7 +554,7 @@ class PrecisionAt3RetrieverEval(BaseEvalPipeline):
         case_id = input_case["id"]
         latest_query, _, _ = self._parse_case(input_case)
         try:
-            content = get_Andrew_Huberman_Insights(latest_query)
+            passages = get_huberman_passages(latest_query)
         except Exception as e:
             return {
                 "id": case_id,
@@ -416,7 +566,6 @@ class PrecisionAt3RetrieverEval(BaseEvalPipeline):
                 "total": 0,
                 "judge_reason": "",
             }
-        passages = _parse_huberman_passages(content)
         k = len(passages) or 1
         if not passages:
             return {
@@ -433,20 +582,7 @@ class PrecisionAt3RetrieverEval(BaseEvalPipeline):
         passages_text = "\n".join(passages)
         prompt = PRECISION_JUDGE_PROMPT.format(query=latest_query, passages=passages_text)
         try:
-            judge_response = await self.client.responses.create(
-                model=self.llm_type,
-                input=prompt,
-                text={
-                    "format": {
-                        "type": "json_schema",
-                        "schema": PRECISION_JUDGE_SCHEMA,
-                        "name": "precision_judge",
-                        "strict": True,
-                    }
-                },
-            )
-            text = judge_response.output[0].content[0].text
-            parsed = json.loads(text)
+            parsed = await self._judge(PRECISION_JUDGE_INSTRUCTIONS, prompt, PRECISION_JUDGE_SCHEMA, "precision_judge")
             relevant_count = min(3, max(0, parsed.get("relevant_count", 0)))
             judge_reason = parsed.get("reason", "")
         except Exception as e:
@@ -482,7 +618,7 @@ class PrecisionAt3AgentEval(BaseEvalPipeline):
         latest_query, user_history, ai_history = self._parse_case(input_case)
         config = self._get_config(input_case)
         try:
-            response = await self.agent.run(
+            response = await self._run_agent(
                 latest_query, self.user_id, user_history, ai_history,
                 eval_mode=True, config=config,
             )
@@ -532,20 +668,7 @@ class PrecisionAt3AgentEval(BaseEvalPipeline):
         passages_text = "\n".join(passages)
         prompt = PRECISION_JUDGE_PROMPT.format(query=latest_query, passages=passages_text)
         try:
-            judge_response = await self.client.responses.create(
-                model=self.llm_type,
-                input=prompt,
-                text={
-                    "format": {
-                        "type": "json_schema",
-                        "schema": PRECISION_JUDGE_SCHEMA,
-                        "name": "precision_judge",
-                        "strict": True,
-                    }
-                },
-            )
-            text = judge_response.output[0].content[0].text
-            parsed = json.loads(text)
+            parsed = await self._judge(PRECISION_JUDGE_INSTRUCTIONS, prompt, PRECISION_JUDGE_SCHEMA, "precision_judge")
             relevant_count = min(3, max(0, parsed.get("relevant_count", 0)))
             judge_reason = parsed.get("reason", "")
         except Exception as e:
@@ -570,18 +693,18 @@ class PrecisionAt3AgentEval(BaseEvalPipeline):
 # Subclass 4: Hit@3 — presence of actual answer in top-3 retrieved chunks (LLM judge)
 # ---------------------------------------------------------------------------
 
-HIT_AT_3_JUDGE_PROMPT = """You are an impartial judge. Given a user question and a list of retrieved passages (top 3 from a knowledge base, in rank order), determine whether at least one passage CONTAINS the actual answer or the information needed to correctly answer the question.
-
-User question: {query}
-
-Retrieved passages (top 3, in order):
-{passages}
+HIT_AT_3_JUDGE_INSTRUCTIONS = """You are an impartial judge. Given a user question and a list of retrieved passages (top 3 from a knowledge base, in rank order), determine whether at least one passage CONTAINS the actual answer or the information needed to correctly answer the question.
 
 Instructions:
 1. Decide if ANY of these passages contain the actual answer (or the key information required to answer) the user's question.
 2. Set "hit" to true if at least one passage contains the answer; set "hit" to false if none of the passages contain the answer.
 3. Provide a brief reason (e.g., which passage contained the answer, or why none did)."""
 
+HIT_AT_3_JUDGE_PROMPT = """User question: {query}
+
+Retrieved passages (top 3, in order):
+{passages}"""
+
 HIT_AT_3_JUDGE_SCHEMA = {
     "type": "object",
     "properties": {
@@ -602,7 +725,7 @@ class HitAt3RetrieverEval(BaseEvalPipeline):
         case_id = input_case["id"]
         latest_query, _, _ = self._parse_case(input_case)
         try:
-            content = get_Andrew_Huberman_Insights(latest_query)
+            passages = get_huberman_passages(latest_query)
         except Exception as e:
             return {
                 "id": case_id,
@@ -614,7 +737,6 @@ class HitAt3RetrieverEval(BaseEvalPipeline):
                 "total": 1,
                 "judge_reason": "",
             }
-        passages = _parse_huberman_passages(content)
         if not passages:
             return {
                 "id": case_id,
@@ -629,20 +751,7 @@ class HitAt3RetrieverEval(BaseEvalPipeline):
         passages_text = "\n".join(f"Rank {i+1}: {p}" for i, p in enumerate(passages))
         prompt = HIT_AT_3_JUDGE_PROMPT.format(query=latest_query, passages=passages_text)
         try:
-            judge_response = await self.client.responses.create(
-                model=self.llm_type,
-                input=prompt,
-                text={
-                    "format": {
-                        "type": "json_schema",
-                        "schema": HIT_AT_3_JUDGE_SCHEMA,
-                        "name": "hit_at_3_judge",
-                        "strict": True,
-                    }
-                },
-            )
-            text = judge_response.output[0].content[0].text
-            parsed = json.loads(text)
+            parsed = await self._judge(HIT_AT_3_JUDGE_INSTRUCTIONS, prompt, HIT_AT_3_JUDGE_SCHEMA, "hit_at_3_judge")
             hit = bool(parsed.get("hit", False))
             judge_reason = parsed.get("reason", "")
         except Exception as e:
@@ -664,12 +773,7 @@ class HitAt3RetrieverEval(BaseEvalPipeline):
 # Subclass 5: MRR (Mean Reciprocal Rank) — score = 1 / rank of first relevant passage
 # ---------------------------------------------------------------------------
 
-MRR_JUDGE_PROMPT = """You are an impartial judge. Given a user question and a list of retrieved passages in rank order (1 = first retrieved, 2 = second, 3 = third), determine at which rank the FIRST passage that contains the actual answer (or the information needed to answer the question) appears.
-
-User question: {query}
-
-Retrieved passages (in rank order):
-{passages}
+MRR_JUDGE_INSTRUCTIONS = """You are an impartial judge. Given a user question and a list of retrieved passages in rank order (1 = first retrieved, 2 = second, 3 = third), determine at which rank the FIRST passage that contains the actual answer (or the information needed to answer the question) appears.
 
 Instructions:
 1. Consider each passage in order (rank 1, then 2, then 3).
@@ -677,6 +781,11 @@ Instructions:
 3. Set "rank" to that position: 1, 2, or 3. If none of the passages contain the answer, set "rank" to 0.
 4. Provide a brief reason (e.g., "Passage 2 contains the answer because...")."""
 
+MRR_JUDGE_PROMPT = """User question: {query}
+
+Retrieved passages (in rank order):
+{passages}"""
+
 MRR_JUDGE_SCHEMA = {
     "type": "object",
     "properties": {
@@ -697,7 +806,7 @@ class MRRRetrieverEval(BaseEvalPipeline):
         case_id = input_case["id"]
         latest_query, _, _ = self._parse_case(input_case)
         try:
-            content = get_Andrew_Huberman_Insights(latest_query)
+            passages = get_huberman_passages(latest_query)
         except Exception as e:
             return {
                 "id": case_id,
@@ -710,7 +819,6 @@ class MRRRetrieverEval(BaseEvalPipeline):
                 "total": 1,
                 "judge_reason": "",
             }
-        passages = _parse_huberman_passages(content)
         if not passages:
             return {
                 "id": case_id,
@@ -726,20 +834,7 @@ class MRRRetrieverEval(BaseEvalPipeline):
         passages_text = "\n".join(f"Rank {i+1}: {p}" for i, p in enumerate(passages))
         prompt = MRR_JUDGE_PROMPT.format(query=latest_query, passages=passages_text)
         try:
-            judge_response = await self.client.responses.create(
-                model=self.llm_type,
-                input=prompt,
-                text={
-                    "format": {
-                        "type": "json_schema",
-                        "schema": MRR_JUDGE_SCHEMA,
-                        "name": "mrr_judge",
-                        "strict": True,
-                    }
-                },
-            )
-            text = judge_response.output[0].content[0].text
-            parsed = json.loads(text)
+            parsed = await self._judge(MRR_JUDGE_INSTRUCTIONS, prompt, MRR_JUDGE_SCHEMA, "mrr_judge")
             rank = min(3, max(0, parsed.get("rank", 0)))
             judge_reason = parsed.get("reason", "")
         except Exception as e:
@@ -764,16 +859,6 @@ class MRRRetrieverEval(BaseEvalPipeline):
 # Namespace Grid Search: run existing eval classes across multiple namespaces
 # ---------------------------------------------------------------------------
 
-def _load_jsonl(path: str) -> list[dict]:
-    rows = []
-    with open(path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                rows.append(json.loads(line))
-    return rows
-
-
 async def run_namespace_grid_search(
     namespace_configs: list[dict],
     evals_data_path: str = "evals/retriever_evals.jsonl",
@@ -784,7 +869,7 @@ async def run_namespace_grid_search(
     Run Precision@3, Hit@3, and MRR@3 across a list of Pinecone namespace
     configs using the existing eval classes.  For each namespace the function
     patches ``settings.PINECONE_NAMESPACE_1`` and ``PINECONE_EMBEDDING_MODE``
-    so that ``get_Andrew_Huberman_Insights`` queries the right index, then
+    so that ``get_huberman_passages`` queries the right index, then
     creates fresh instances of each eval class and calls ``run_evals()``.
 
     Each config dict must have:
@@ -918,29 +1003,45 @@ async def run_namespace_grid_search(
         )
     print(f"{'=' * 80}")
 
-    with open(output_path, "w") as f:
-        json.dump(experiment, f, indent=2)
+    # Compact output - pipe through `jq .` to read it
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps(experiment))
     print(f"\nExperiment saved -> {output_path}")
 
     return experiment
 
 
+async def close_clients_after(coro):
+    """
+    Await an eval entry point, then close the shared HTTP client
+
+    The client's connection pool belongs to the event loop uvloop.run creates,
+    so it is closed before that loop shuts down.
+    """
+    try:
+        return await coro
+    finally:
+        await http_client.aclose()
+
+
 if __name__ == "__main__":
     # Example: Precision@3 Retriever (single namespace, uses current settings)
     # precision_at_3_retriever_eval = PrecisionAt3RetrieverEval(unique_eval_path="evals/retriever_evals.jsonl")
-    # out = asyncio.run(precision_at_3_retriever_eval.run_evals(concurrent_evals=5, output_file_path="evals/precision_at_3_retriever_evals_results.jsonl"))
+    # out = uvloop.run(close_clients_after(precision_at_3_retriever_eval.run_evals(concurrent_evals=5, output_file_path="evals/precision_at_3_retriever_evals_results.jsonl")))
 
     # Example: Hit@3 Retriever
     # eval_pipeline = HitAt3RetrieverEval(unique_eval_path="evals/retriever_evals.jsonl")
-    # out = asyncio.run(eval_pipeline.run_evals(concurrent_evals=5, output_file_path="evals/hit_at_3_retriever_evals_results.jsonl"))
+    # out = uvloop.run(close_clients_after(eval_pipeline.run_evals(concurrent_evals=5, output_file_path="evals/hit_at_3_retriever_evals_results.jsonl")))
 
     # Example: MRR Retriever
     # eval_pipeline = MRRRetrieverEval(unique_eval_path="evals/retriever_evals.jsonl")
-    # out = asyncio.run(eval_pipeline.run_evals(concurrent_evals=5, output_file_path="evals/mrr_retriever_evals_results.jsonl"))
+    # out = uvloop.run(close_clients_after(eval_pipeline.run_evals(concurrent_evals=5, output_file_path="evals/mrr_retriever_evals_results.jsonl")))
 
     # Example: Tool Traces eval
     # eval_pipeline = ToolTracesEval()
-    # out = asyncio.run(eval_pipeline.run_evals(concurrent_evals=5, output_file_path="evals/tool_traces_evals_results.jsonl"))
+    # out = uvloop.run(close_clients_after(eval_pipeline.run_evals(concurrent_evals=5, output_file_path="evals/tool_traces_evals_results.jsonl")))
+    # Large suites: judge via the Batch API instead (falls back to run_evals under BATCH_MIN_ROWS cases)
+    # out = uvloop.run(close_clients_after(eval_pipeline.run_evals_batch(concurrent_evals=5, output_file_path="evals/tool_traces_evals_results.jsonl")))
 
     # ── Namespace Grid Search ────────────────────────────────────────
     # Same configs used in content_aggregation.py GRID_SEARCH_CONFIGS
@@ -957,9 +1058,9 @@ if __name__ == "__main__":
         # {"chunk_size": 300,  "chunk_overlap": 75,  "embedding_mode": "pinecone_inference", "namespace": "llama_cs300_co75"},
     ]
 
-    experiment = asyncio.run(run_namespace_grid_search(
+    experiment = uvloop.run(close_clients_after(run_namespace_grid_search(
         namespace_configs=NAMESPACE_CONFIGS,
         evals_data_path="evals/retriever_evals.jsonl",
         concurrent_evals=5,
         output_path="evals/namespace_experiment_results.json",
-    ))
+    )))
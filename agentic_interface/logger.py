@@ -1,7 +1,7 @@
 """
 Logging Data Models for AI Conversation Tracking
 
-Defines Pydantic models for structured logging of:
+Defines msgspec Structs for structured logging of:
 - User queries and AI responses
 - Tool calls and their results
 - Conversation context and metadata
@@ -12,12 +12,17 @@ These logs enable:
 - Feedback collection for model improvement
 - Debugging tool call issues
 - Conversation history analysis
+
+Log entries are built by the backend itself (never parsed from user input),
+so they use msgspec.Struct instead of Pydantic: construction is a plain
+attribute fill with no validation pass, and msgspec.json.encode serializes
+them directly to bytes.
 """
 
-from pydantic import BaseModel
+import msgspec
 from typing import Optional, Any
 
-class ToolCall(BaseModel):
+class ToolCall(msgspec.Struct, kw_only=True):
     """
     Represents a single tool invocation during AI reasoning
     
@@ -32,7 +37,7 @@ class ToolCall(BaseModel):
     result: Optional[Any] = None
     error: Optional[str] = None
 
-class Feedback(BaseModel):
+class Feedback(msgspec.Struct, kw_only=True):
     """
     User feedback on AI response quality
     
@@ -43,7 +48,7 @@ class Feedback(BaseModel):
     good_bad: bool
     reason: str
 
-class MessageContext(BaseModel):
+class MessageContext(msgspec.Struct, kw_only=True):
     """
     Context and metadata for a conversation turn
     
@@ -56,7 +61,7 @@ class MessageContext(BaseModel):
     tool_calls: list[ToolCall]
     message_history: Optional[list[dict]] = None
 
-class Logger(BaseModel):
+class Logger(msgspec.Struct, kw_only=True):
     """
     Complete log entry for an AI conversation turn
     
@@ -14,23 +14,51 @@ Architecture:
 - Leverages OpenAI GPT-4 for intelligent health insights
 - Stores conversation logs for feedback and improvement
 
-Entry Point: Run with `uvicorn main_agent:app --host 0.0.0.0 --port 8000`
+Entry Point: Run with `uvicorn main_agent:app --host 0.0.0.0 --port 8000 --loop uvloop`
 """
 
-from fastapi import FastAPI, Query
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 from config.settings import settings
-import json
+from clients import http_client
+import anyio
+import logging
+import orjson
 
 # Local Modules
 from Agentic_RAG.agent import AgenticRAG
+from Agentic_RAG.tools import get_passage_encoding
+from database.user_db_call import UserDbOperations
+from DataSources.embeddings import get_embeddings
 from user_tools import load_user_devices_service, load_user_goals_service
 
+logger = logging.getLogger(__name__)
+
+# Pre-encoded SSE framing - events are written to the stream as bytes
+SSE_DATA = b"data: "
+SSE_END = b"\n\n"
+SSE_TOKEN_PREFIX = b'data: {"type":"token","content":'
+SSE_TOKEN_END = b"}\n\n"
+
+def _encode_sse(event: dict) -> bytes:
+    """
+    Frame one agent event as an SSE message
+
+    Token events (the bulk of a stream) only JSON-escape the token text;
+    other events are serialized whole.
+    """
+    if event.get("type") == "token":
+        return SSE_TOKEN_PREFIX + orjson.dumps(event["content"]) + SSE_TOKEN_END
+    return SSE_DATA + orjson.dumps(event) + SSE_END
+
 # Pydantic models for request validation
 
 class QueryBody(BaseModel):
     """Request body for AI chat queries"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+
     query: str  # User's question/query
     username: str  # Username for context and personalization
     user_history: list[str]  # Previous user messages in conversation
@@ -38,22 +66,48 @@ class QueryBody(BaseModel):
 
 class LoadUserDevicesBody(BaseModel):
     """Request body for loading device metrics"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+
     device_type: str  # Type of wearable device (e.g., "Oura Ring")
     device_name: str  # User-assigned name for device
     api_key: str  # API key for accessing device data
 
+# Initialize single shared database layer and AgenticRAG instance
+# This singleton pattern ensures efficient resource usage
+# User-specific context is passed per request
+user_db = UserDbOperations()
+agent = AgenticRAG(user_db_operations=user_db)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan hook
+
+    Opens the database connection pool before the first request so no user
+    pays the connection handshakes (failing startup if the log table has not
+    been migrated), loads the passage tokenizer and, when retrieval runs on
+    HuggingFace, the embedding model weights, starts the background log
+    writer, and flushes pending logs, releases the pool and closes the
+    shared HTTP client on shutdown.
+    """
+    await user_db.open_pool()
+    if settings.PINECONE_EMBEDDING_MODE != "pinecone_inference":
+        await anyio.to_thread.run_sync(get_embeddings)
+    await anyio.to_thread.run_sync(get_passage_encoding)
+    user_db.start_log_worker()
+    yield
+    await user_db.close_connection()
+    await http_client.aclose()
+
 # Initialize FastAPI application
 app = FastAPI(
     title="Pulsy Backend API",
     description="AI-powered health advisory backend with RAG capabilities",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # serialize JSON replies with orjson
 )
 
-# Initialize single shared AgenticRAG instance
-# This singleton pattern ensures efficient resource usage
-# User-specific context is passed per request
-agent = AgenticRAG()
-
 @app.post("/load_user_devices/")
 async def load_user_devices(load_user_devices_body: LoadUserDevicesBody) -> dict[str, str|int|float]:
     """
@@ -109,12 +163,13 @@ async def post_query(query: QueryBody) -> dict[str, str|int]:
     return res
 
 @app.post("/queryTest/")
-async def post_query_test(query: QueryBody) -> str:
+async def post_query_test(request: Request) -> str:
     """
     Test endpoint for debugging query structure
-    Prints query components and returns confirmation
+    Logs the raw query body at DEBUG (no model validation) and returns confirmation
     """
-    print(query.query, query.username, query.user_history, query.ai_chat_history)
+    query = await request.json()
+    logger.debug("%s %s %s %s", query.get("query"), query.get("username"), query.get("user_history"), query.get("ai_chat_history"))
     return "Test"
 
 
@@ -151,9 +206,9 @@ async def stream_query(
     """
     # Parse JSON-encoded history arrays
     try:
-        user_history_list = json.loads(user_history)
-        ai_chat_history_list = json.loads(ai_chat_history)
-    except json.JSONDecodeError:
+        user_history_list = orjson.loads(user_history)
+        ai_chat_history_list = orjson.loads(ai_chat_history)
+    except orjson.JSONDecodeError:
         user_history_list = []
         ai_chat_history_list = []
     
@@ -169,11 +224,11 @@ async def stream_query(
                 ai_chat_history_list
             ):
                 # Format as SSE: "data: {...}\n\n"
-                yield f"data: {json.dumps(event)}\n\n"
+                yield _encode_sse(event)
         except Exception as e:
             # Send error event if something goes wrong
             error_event = {"type": "error", "message": str(e)}
-            yield f"data: {json.dumps(error_event)}\n\n"
+            yield _encode_sse(error_event)
     
     return StreamingResponse(
         event_generator(),
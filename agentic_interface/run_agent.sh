@@ -10,9 +10,13 @@ cleanup() {
 # Set up trap for cleanup
 trap cleanup EXIT
 
+# Apply schema migrations - the server refuses to start without them
+echo "Applying database migrations..."
+python -m database.user_db_call migrate || exit 1
+
 # Start Agent Server in background
 echo "Starting Agent Server..."
-uvicorn main_agent:app &
+uvicorn main_agent:app --loop uvloop &
 
 # Wait for the Agent Server to finish
 wait
\ No newline at end of file
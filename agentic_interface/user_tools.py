@@ -10,19 +10,39 @@ Currently supports: Oura Ring
 Planned support: Apple Watch, Fitbit
 
 TODO: 
-- Add average calculation for heart rate data
 - Extend support to other wearable devices
-- Add data caching for performance
 """
 
-from DataSources.oura_data_aggregation import OuraData
-from datetime import datetime, timedelta
-import json
+from DataSources.oura_data_aggregation import OuraData, utc_today
+from cachetools import TTLCache
+from datetime import timedelta
+import anyio
+import numpy as np
+import orjson
 import os
 from fastapi import HTTPException
 
 # Constants
 MAIN_DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__),"../shared/user_state.json"))
+OURA_CACHE_MAXSIZE = 1024
+OURA_CACHE_TTL = 300  # seconds - the window always reaches today, which is still filling in
+
+# Oura payloads keyed by (api_key, start_date, end_date)
+_oura_cache = TTLCache(maxsize=OURA_CACHE_MAXSIZE, ttl=OURA_CACHE_TTL)
+
+# Parsed user_state.json, reloaded only when the file's mtime changes
+_user_db_cache = {"mtime": None, "data": None}
+
+def _read_user_db() -> dict:
+    """
+    Return the parsed user state file, re-reading it only after it changes on disk
+    """
+    mtime = os.stat(MAIN_DB_PATH).st_mtime_ns
+    if mtime != _user_db_cache["mtime"]:
+        with open(MAIN_DB_PATH, 'rb') as file:
+            _user_db_cache["data"] = orjson.loads(file.read())
+        _user_db_cache["mtime"] = mtime
+    return _user_db_cache["data"]
 
 async def load_user_devices_service(device: dict) -> dict[str, str|int|float]:
     """
@@ -31,7 +51,7 @@ async def load_user_devices_service(device: dict) -> dict[str, str|int|float]:
     Fetches data from the previous day and consolidates key metrics:
     - Sleep score (0-100)
     - Stress level (hours of high stress)
-    - Heart rate (BPM)
+    - Heart rate (average BPM)
     
     Args:
         device: Dictionary containing:
@@ -45,40 +65,44 @@ async def load_user_devices_service(device: dict) -> dict[str, str|int|float]:
     Raises:
         HTTPException: 400 if device type not supported
         HTTPException: 4xx/5xx if device API returns error
-    
-    TODO: Calculate average heart rate instead of using first value
     """
     device_type = device["device_type"]
     result_data = {}
 
     if device_type == "Oura Ring":
-        # Calculate date range for yesterday's data
-        start_date = datetime.today() - timedelta(days=1)
-        end_date = datetime.today()
-        
-        # Initialize Oura Ring data aggregator
-        oura_ring = OuraData(
-            device["api_key"], 
-            str(start_date).split(" ")[0], 
-            str(end_date).split(" ")[0]
-        )
-        
-        # Fetch all metrics from Oura API
-        data_result = oura_ring.pre_load_user_data()
+        # Calculate date range for yesterday's data (UTC, independent of server timezone)
+        today = utc_today()
+        start_date, end_date = (today - timedelta(days=1)).isoformat(), today.isoformat()
+
+        # Reuse a recent fetch of the same window - repeated dashboard loads skip the Oura API
+        cache_key = (device["api_key"], start_date, end_date)
+        data_result = _oura_cache.get(cache_key)
+        if data_result is None:
+            # Initialize Oura Ring data aggregator
+            oura_ring = OuraData(device["api_key"], start_date, end_date)
+
+            # Fetch all metrics from Oura API - the three endpoints are requested concurrently
+            data_result = await oura_ring.pre_load_user_data()
+            _oura_cache[cache_key] = data_result
 
         # Extract individual metric categories
-        sleep_data = data_result["sleep_data"]
-        stress_data = data_result["stress_data"]
-        heart_rate_data = data_result["heart_rate_data"]
+        sleep_data = data_result.get("sleep_data")
+        stress_data = data_result.get("stress_data")
+        heart_rate_data = data_result.get("heart_rate_data")
 
         # Consolidate primary metrics (using most recent data point)
         if sleep_data:
-            result_data["sleep_score"] = sleep_data[0]["score"]
+            result_data["sleep_score"] = sleep_data[0].get("score")
         if stress_data:
-            result_data["stress_score"] = stress_data[0]["stress_high"]
+            result_data["stress_score"] = stress_data[0].get("stress_high")
         if heart_rate_data:
-            # TODO: Calculate average BPM instead of using first reading
-            result_data["heart_rate_data"] = heart_rate_data[0]["bpm"]
+            # Average over every reading in the window that carries a bpm value
+            bpms = np.fromiter(
+                (reading["bpm"] for reading in heart_rate_data if reading.get("bpm") is not None),
+                dtype=np.float64
+            )
+            if bpms.size:
+                result_data["heart_rate_data"] = round(float(bpms.mean()), 1)
     else:
         raise HTTPException(status_code=400, detail=f"Device type {device_type} not supported")
     
@@ -106,7 +130,8 @@ async def load_user_goals_service(user_id: str) -> dict[str, dict[str, str|list[
             }
     
     Note: Currently reads from JSON file, will migrate to PostgreSQL
+    The file is cached in memory and only re-parsed when its mtime changes;
+    the stat/read runs in a worker thread to keep the event loop free.
     """
-    with open(MAIN_DB_PATH, 'r') as file:
-        user_db = json.load(file)
-        return user_db[user_id]["goals"]
\ No newline at end of file
+    user_db = await anyio.to_thread.run_sync(_read_user_db)
+    return user_db[user_id]["goals"]
\ No newline at end of file
@@ -228,7 +228,7 @@ class Controller {
 
     /**
      * Add user feedback for an AI response
-     * @param {number} log_id - ID of the logged message
+     * @param {string} log_id - UUID of the logged message
      * @param {string} feedback - "up" or "down" for thumbs up/down
      * @param {string} comment - Optional text feedback
      * @returns {Promise<object>} Success status
@@ -260,7 +260,7 @@ class Controller {
      * @param {string} username - User's username
      * @param {string} query - User's query
      * @param {string} response - AI response
-     * @param {number|null} logId - Log ID for feedback tracking
+     * @param {string|null} logId - Log ID for feedback tracking
      * @returns {Promise<object>} Success status
      */
     saveChatHistory(username, query, response, logId) {
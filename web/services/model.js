@@ -599,7 +599,7 @@ class Model {
      * @param {string} username - User's username
      * @param {string} query - User's query
      * @param {string} response - AI response
-     * @param {number|null} logId - Log ID for feedback tracking
+     * @param {string|null} logId - Log ID for feedback tracking
      * @returns {Promise<Object>} Result of the save operation
      */
     saveChatHistory(username, query, response, logId) {
@@ -369,7 +369,7 @@ class UserDbOperations {
 
   /**
    * Add feedback and preferred response for a logging record
-   * @param {number} log_id
+   * @param {string} log_id - log_uuid returned by the agent backend
    * @param {string} feedback
    * @param {string|null} preferred_response
    * @returns {Promise<object>}
@@ -379,7 +379,7 @@ class UserDbOperations {
     const query = `
       UPDATE logging.logger_final
       SET feedback = ?, preferred_response = ?
-      WHERE id = ?
+      WHERE log_uuid = ?
     `;
     try{
       const knex_res = await this.pool;
@@ -396,7 +396,7 @@ class UserDbOperations {
    * @param {string} username
    * @param {string} query - User's query
    * @param {string} response - AI response (markdown/HTML)
-   * @param {number|null} log_id - Log ID for feedback tracking
+   * @param {string|null} log_id - Log ID for feedback tracking
    * @returns {Promise<object>}
    */
   async saveChatHistory(username, query, response, log_id) {